@@ -0,0 +1,5 @@
+"""
+MCP integration for Harmony Design System
+
+See: harmony-design/mcp/README.md
+"""
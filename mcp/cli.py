@@ -7,24 +7,102 @@ Usage:
     python -m harmony_design.mcp.cli update-state button-primary implemented --force
 """
 
-import argparse
-import json
 import sys
-from pathlib import Path
-from tools.update_component_state import update_component_state
 
 
-def main():
-    """Main CLI entry point."""
-    parser = argparse.ArgumentParser(
-        description="Harmony Design System MCP Tools"
+# Known subcommands and their one-line help text
+COMMANDS = {
+    "update-state": "Update component state with validation",
+}
+
+
+def _sniff_subcommand(argv):
+    """
+    Peek at the requested subcommand before building parsers.
+
+    Args:
+        argv: Full argument vector (including program name)
+
+    Returns:
+        Subcommand name if argv[1] is a known command, otherwise None
+    """
+    if len(argv) > 1 and argv[1] in COMMANDS:
+        return argv[1]
+    return None
+
+
+def _fast_parse_update_state(argv):
+    """
+    Parse the common update-state invocation without argparse.
+
+    Handles only the plain shape: two positionals plus optional --force
+    and --repo-root. Anything else (help, unknown flags, missing or
+    extra arguments) returns None so argparse can handle and report it.
+
+    Args:
+        argv: Full argument vector (including program name)
+
+    Returns:
+        Dict of update_component_state arguments, or None to fall back
+    """
+    if argv[1:2] != ["update-state"]:
+        return None
+
+    positionals = []
+    force = False
+    repo_root = "."
+    args = iter(argv[2:])
+    for arg in args:
+        if arg == "--force":
+            force = True
+        elif arg == "--repo-root":
+            repo_root = next(args, None)
+            # argparse rejects a missing value or one that looks like a flag
+            if repo_root is None or repo_root.startswith("-"):
+                return None
+        elif arg.startswith("--repo-root="):
+            repo_root = arg.split("=", 1)[1]
+        elif arg.startswith("-"):
+            return None
+        else:
+            positionals.append(arg)
+
+    if len(positionals) != 2:
+        return None
+    return {
+        "component_id": positionals[0],
+        "new_state": positionals[1],
+        "force": force,
+        "repo_root": repo_root,
+    }
+
+
+def _run_update_state(component_id, new_state, force, repo_root):
+    """Run update-state, print the JSON result and exit 1 on failure."""
+    # Deferred so --help and invalid commands skip loading the tool
+    import json
+    from tools.update_component_state import update_component_state
+
+    result = update_component_state(
+        component_id=component_id,
+        new_state=new_state,
+        force=force,
+        repo_root=repo_root
     )
-    subparsers = parser.add_subparsers(dest="command", help="Command to run")
     
-    # update-state command
+    # Pretty print result
+    print(json.dumps(result, indent=2))
+    
+    # Exit with error code if failed
+    if not result["success"]:
+        sys.exit(1)
+
+
+def _add_update_state_parser(subparsers):
+    """Register the update-state subcommand with its arguments."""
     update_parser = subparsers.add_parser(
         "update-state",
-        help="Update component state with validation"
+        help=COMMANDS["update-state"]
     )
     update_parser.add_argument(
         "component_id",
@@ -44,26 +122,43 @@ def main():
         default=".",
         help="Repository root directory (default: current directory)"
     )
+
+
+def main():
+    """Main CLI entry point."""
+    # Common case: a well-formed update-state call needs no argparse at all
+    fast_args = _fast_parse_update_state(sys.argv)
+    if fast_args is not None:
+        _run_update_state(**fast_args)
+        return
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Harmony Design System MCP Tools"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    # Only build the full subparser for the command actually requested;
+    # help and unknown commands get argument-less stubs for listing
+    command = _sniff_subcommand(sys.argv)
+    if command == "update-state":
+        _add_update_state_parser(subparsers)
+    else:
+        for name, help_text in COMMANDS.items():
+            subparsers.add_parser(name, help=help_text)
     
     args = parser.parse_args()
     
     if args.command == "update-state":
-        result = update_component_state(
-            component_id=args.component_id,
-            new_state=args.new_state,
-            force=args.force,
-            repo_root=args.repo_root
+        _run_update_state(
+            args.component_id,
+            args.new_state,
+            args.force,
+            args.repo_root
         )
-        
-        # Pretty print result
-        print(json.dumps(result, indent=2))
-        
-        # Exit with error code if failed
-        if not result["success"]:
-            sys.exit(1)
     else:
-        parser.print_help()
-        sys.exit(1)
+        parser.error(f"command required: {', '.join(COMMANDS)}")
 
 
 if __name__ == "__main__":
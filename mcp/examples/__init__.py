@@ -0,0 +1,3 @@
+"""
+Usage examples for Harmony Design System MCP tools
+"""
@@ -4,16 +4,13 @@ Example: Using update_component_state MCP tool
 This example demonstrates how to update component state
 with automatic validation.
 
+Run from the repository root:
+    python -m mcp.examples.update_state_example
+
 See: harmony-design/DESIGN_SYSTEM.md#mcp-tools
 """
 
-from pathlib import Path
-import sys
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from tools.update_component_state import update_component_state
+from ..tools.update_component_state import update_component_state
 
 
 def example_successful_update():
@@ -0,0 +1,82 @@
+"""
+Tests for the MCP CLI argument parsing
+
+Run with: pytest harmony-design/mcp/test_cli.py
+"""
+
+import sys
+import pytest
+import cli
+
+
+def _parse_via_main(monkeypatch, argv, fast=True):
+    """Run cli.main() on argv and return the arguments it would run update-state with."""
+    calls = []
+    
+    def record(component_id, new_state, force, repo_root):
+        calls.append({
+            "component_id": component_id,
+            "new_state": new_state,
+            "force": force,
+            "repo_root": repo_root,
+        })
+    
+    monkeypatch.setattr(cli, "_run_update_state", record)
+    monkeypatch.setattr(sys, "argv", ["cli.py", *argv])
+    if not fast:
+        monkeypatch.setattr(cli, "_fast_parse_update_state", lambda argv: None)
+    cli.main()
+    assert len(calls) == 1
+    return calls[0]
+
+
+@pytest.mark.parametrize("argv", [
+    ["update-state", "button-primary", "design_complete"],
+    ["update-state", "button-primary", "implemented", "--force"],
+    ["update-state", "--force", "button-primary", "implemented"],
+    ["update-state", "button-primary", "implemented", "--repo-root", "/tmp/repo"],
+    ["update-state", "button-primary", "implemented", "--repo-root=/tmp/repo", "--force"],
+])
+def test_fast_parse_matches_argparse(monkeypatch, argv):
+    """Test --flag value and --flag=value forms parse as argparse does."""
+    fast = cli._fast_parse_update_state(["cli.py", *argv])
+    assert fast is not None
+    assert _parse_via_main(monkeypatch, argv) == fast
+    assert _parse_via_main(monkeypatch, argv, fast=False) == fast
+
+
+@pytest.mark.parametrize("argv", [
+    ["update-state", "button-primary", "implemented", "--verbose"],
+    ["update-state", "button-primary"],
+    ["update-state", "button-primary", "implemented", "--repo-root"],
+    ["update-state", "button-primary", "implemented", "--repo-root", "-x"],
+    ["update-state"],
+])
+def test_fast_parse_falls_back_to_argparse_errors(monkeypatch, argv, capsys):
+    """Test unknown flags and missing arguments are left to argparse (exit 2)."""
+    assert cli._fast_parse_update_state(["cli.py", *argv]) is None
+    
+    for fast in (True, False):
+        with pytest.raises(SystemExit) as excinfo:
+            _parse_via_main(monkeypatch, argv, fast=fast)
+        assert excinfo.value.code == 2
+        assert "error:" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [
+    ["--help"],
+    ["update-state", "--help"],
+    ["update-state", "button-primary", "implemented", "-h"],
+])
+def test_help_is_left_to_argparse(monkeypatch, argv, capsys):
+    """Test help requests fall back to argparse and exit 0 with usage text."""
+    assert cli._fast_parse_update_state(["cli.py", *argv]) is None
+    
+    outputs = []
+    for fast in (True, False):
+        with pytest.raises(SystemExit) as excinfo:
+            _parse_via_main(monkeypatch, argv, fast=fast)
+        assert excinfo.value.code == 0
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1]
+    assert outputs[0].startswith("usage:")
@@ -7,6 +7,9 @@ state transitions, and validation workflows.
 See: harmony-design/DESIGN_SYSTEM.md#mcp-tools
 """
 
+# Imported eagerly: the submodule shares the function's name, and a lazy
+# module __getattr__ never runs once `import tools.update_component_state`
+# has bound the package attribute to the submodule
 from .update_component_state import update_component_state, TOOL_METADATA
 
-__all__ = ['update_component_state', 'TOOL_METADATA']
\ No newline at end of file
+__all__ = ['update_component_state', 'TOOL_METADATA']
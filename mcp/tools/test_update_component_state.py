@@ -5,73 +5,87 @@ Run with: pytest harmony-design/mcp/tools/test_update_component_state.py
 """
 
 import json
-import pytest
+import os
+import shutil
+import subprocess
+import sys
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from update_component_state import ComponentStateUpdater, update_component_state
+import pytest
+from update_component_state import (
+    TOOL_METADATA,
+    ComponentStateUpdater,
+    update_component_state,
+)
 
 
-@pytest.fixture
-def temp_repo():
-    """Create a temporary repository structure for testing."""
-    with TemporaryDirectory() as tmpdir:
-        repo_root = Path(tmpdir)
-        
-        # Create directory structure
-        state_machine_dir = repo_root / "harmony-design" / "state-machine"
-        components_dir = repo_root / "harmony-design" / "components"
-        state_machine_dir.mkdir(parents=True)
-        components_dir.mkdir(parents=True)
-        
-        # Create state machine definition
-        definition = {
-            "states": ["draft", "design_complete", "implemented", "validated"],
-            "transitions": {
-                "draft_to_design_complete": True,
-                "design_complete_to_implemented": True,
-                "implemented_to_validated": True
-            }
+@pytest.fixture(scope="session")
+def template_repo(tmp_path_factory):
+    """Build the repository structure once per test session."""
+    repo_root = tmp_path_factory.mktemp("template") / "repo"
+    
+    # Create directory structure
+    state_machine_dir = repo_root / "harmony-design" / "state-machine"
+    components_dir = repo_root / "harmony-design" / "components"
+    state_machine_dir.mkdir(parents=True)
+    components_dir.mkdir(parents=True)
+    
+    # Create state machine definition
+    definition = {
+        "states": ["draft", "design_complete", "implemented", "validated"],
+        "transitions": {
+            "draft_to_design_complete": True,
+            "design_complete_to_implemented": True,
+            "implemented_to_validated": True
         }
-        with open(state_machine_dir / "definition.json", 'w') as f:
-            json.dump(definition, f)
-        
-        # Create transition rules
-        rules = {
-            "transitions": {
-                "draft_to_design_complete": {
-                    "prerequisites": [
-                        {
-                            "type": "file_exists",
-                            "path": "harmony-design/components/{component_id}.pen",
-                            "description": "Design specification file must exist"
-                        }
-                    ]
-                },
-                "design_complete_to_implemented": {
-                    "prerequisites": [
-                        {
-                            "type": "file_exists",
-                            "path": "harmony-design/components/{component_id}.js",
-                            "description": "Implementation file must exist"
-                        }
-                    ]
-                }
+    }
+    with open(state_machine_dir / "definition.json", 'w') as f:
+        json.dump(definition, f)
+    
+    # Create transition rules
+    rules = {
+        "transitions": {
+            "draft_to_design_complete": {
+                "prerequisites": [
+                    {
+                        "type": "file_exists",
+                        "path": "harmony-design/components/{component_id}.pen",
+                        "description": "Design specification file must exist"
+                    }
+                ]
+            },
+            "design_complete_to_implemented": {
+                "prerequisites": [
+                    {
+                        "type": "file_exists",
+                        "path": "harmony-design/components/{component_id}.js",
+                        "description": "Implementation file must exist"
+                    }
+                ]
             }
         }
-        with open(state_machine_dir / "transition-rules.json", 'w') as f:
-            json.dump(rules, f)
-        
-        # Create sample component state
-        component_state = {
-            "component_id": "button-primary",
-            "state": "draft",
-            "links": {},
-            "state_history": []
-        }
-        with open(components_dir / "button-primary.state.json", 'w') as f:
-            json.dump(component_state, f)
-        
-        yield repo_root
+    }
+    with open(state_machine_dir / "transition-rules.json", 'w') as f:
+        json.dump(rules, f)
+    
+    # Create sample component state
+    component_state = {
+        "component_id": "button-primary",
+        "state": "draft",
+        "links": {},
+        "state_history": []
+    }
+    with open(components_dir / "button-primary.state.json", 'w') as f:
+        json.dump(component_state, f)
+    
+    return repo_root
+
+
+@pytest.fixture
+def temp_repo(template_repo, tmp_path):
+    """Give each test its own copy of the template repository."""
+    repo_root = tmp_path / "repo"
+    shutil.copytree(template_repo, repo_root)
+    return repo_root
 
 
 def test_load_state_machine(temp_repo):
@@ -93,6 +107,37 @@ def test_load_transition_rules(temp_repo):
     assert "draft_to_design_complete" in rules["transitions"]
 
 
+def test_load_transition_rules_reloads_on_change(temp_repo):
+    """Test cached transition rules are re-read after the file changes."""
+    updater = ComponentStateUpdater(temp_repo)
+    rules_file = temp_repo / "harmony-design" / "state-machine" / "transition-rules.json"
+    assert "draft_to_design_complete" in updater.load_transition_rules()["transitions"]
+    
+    with open(rules_file, 'w') as f:
+        json.dump({"transitions": {"draft_to_validated": {}}}, f)
+    stat = rules_file.stat()
+    os.utime(rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    rules = updater.load_transition_rules()
+    assert "draft_to_validated" in rules["transitions"]
+    assert "draft_to_design_complete" not in rules["transitions"]
+
+
+def test_load_transition_rules_reloads_on_same_mtime(temp_repo):
+    """Test a rewrite that keeps the mtime is still re-read."""
+    updater = ComponentStateUpdater(temp_repo)
+    rules_file = temp_repo / "harmony-design" / "state-machine" / "transition-rules.json"
+    before = rules_file.stat()
+    assert "draft_to_design_complete" in updater.load_transition_rules()["transitions"]
+    
+    with open(rules_file, 'w') as f:
+        json.dump({"transitions": {"draft_to_validated": {}}}, f)
+    os.utime(rules_file, ns=(before.st_atime_ns, before.st_mtime_ns))
+    
+    rules = updater.load_transition_rules()
+    assert "draft_to_validated" in rules["transitions"]
+
+
 def test_get_component_state(temp_repo):
     """Test retrieving component state."""
     updater = ComponentStateUpdater(temp_repo)
@@ -120,6 +165,22 @@ def test_validate_transition_missing_prerequisite(temp_repo):
     assert "Design specification file must exist" in errors[0]
 
 
+def test_validate_transition_undefined(temp_repo):
+    """Test validation fails for a transition missing from the rules."""
+    updater = ComponentStateUpdater(temp_repo)
+    rules = updater.load_transition_rules()
+    
+    is_valid, errors = updater.validate_transition(
+        "button-primary",
+        "draft",
+        "validated",
+        rules
+    )
+    
+    assert not is_valid
+    assert errors == ["No transition defined from 'draft' to 'validated'"]
+
+
 def test_validate_transition_with_prerequisite(temp_repo):
     """Test validation succeeds when prerequisite is met."""
     updater = ComponentStateUpdater(temp_repo)
@@ -140,6 +201,105 @@ def test_validate_transition_with_prerequisite(temp_repo):
     assert len(errors) == 0
 
 
+def test_validate_transition_shared_directory_prerequisites(temp_repo):
+    """Test several file_exists prerequisites in one directory."""
+    updater = ComponentStateUpdater(temp_repo)
+    components_dir = temp_repo / "harmony-design" / "components"
+    (components_dir / "button-primary.js").write_text("// Implementation")
+    rules = {
+        "transitions": {
+            "draft_to_implemented": {
+                "prerequisites": [
+                    {
+                        "type": "file_exists",
+                        "path": "harmony-design/components/{component_id}.js",
+                        "description": "Implementation file must exist"
+                    },
+                    {
+                        "type": "file_exists",
+                        "path": "harmony-design/components/{component_id}.test.js",
+                        "description": "Test file must exist"
+                    }
+                ]
+            }
+        }
+    }
+    
+    is_valid, errors = updater.validate_transition(
+        "button-primary",
+        "draft",
+        "implemented",
+        rules
+    )
+    
+    assert not is_valid
+    assert errors == ["Prerequisite not met: Test file must exist"]
+
+
+def test_validate_transition_shared_directory_broken_symlink(temp_repo):
+    """Test a broken symlink does not satisfy a listed file_exists prerequisite."""
+    updater = ComponentStateUpdater(temp_repo)
+    components_dir = temp_repo / "harmony-design" / "components"
+    (components_dir / "button-primary.js").write_text("// Implementation")
+    (components_dir / "button-primary.test.js").symlink_to(components_dir / "missing.js")
+    rules = {
+        "transitions": {
+            "draft_to_implemented": {
+                "prerequisites": [
+                    {
+                        "type": "file_exists",
+                        "path": "harmony-design/components/{component_id}.js",
+                        "description": "Implementation file must exist"
+                    },
+                    {
+                        "type": "file_exists",
+                        "path": "harmony-design/components/{component_id}.test.js",
+                        "description": "Test file must exist"
+                    }
+                ]
+            }
+        }
+    }
+    
+    is_valid, errors = updater.validate_transition(
+        "button-primary",
+        "draft",
+        "implemented",
+        rules
+    )
+    
+    assert not is_valid
+    assert errors == ["Prerequisite not met: Test file must exist"]
+
+
+def test_check_prerequisite_types(temp_repo):
+    """Test property_set, linked_resources and unknown prerequisite types."""
+    updater = ComponentStateUpdater(temp_repo)
+    state = {
+        "metadata": {"owner": "design-team", "reviewer": None},
+        "links": {"figma": ["https://example.com/file"], "storybook": []}
+    }
+    
+    assert updater._check_prerequisite(
+        "button-primary", {"type": "property_set", "property": "metadata.owner"}, state
+    )
+    assert not updater._check_prerequisite(
+        "button-primary", {"type": "property_set", "property": "metadata.reviewer"}, state
+    )
+    assert not updater._check_prerequisite(
+        "button-primary", {"type": "property_set", "property": "metadata.missing"}, state
+    )
+    assert updater._check_prerequisite(
+        "button-primary", {"type": "linked_resources", "link_type": "figma"}, state
+    )
+    assert not updater._check_prerequisite(
+        "button-primary", {"type": "linked_resources", "link_type": "storybook"}, state
+    )
+    assert not updater._check_prerequisite(
+        "button-primary", {"type": "unknown"}, state
+    )
+
+
 def test_update_state_success(temp_repo):
     """Test successful state update."""
     # Create prerequisite file
@@ -157,6 +317,9 @@ def test_update_state_success(temp_repo):
     updated_state = updater.get_component_state("button-primary")
     assert updated_state["state"] == "design_complete"
     assert len(updated_state["state_history"]) == 1
+    timestamp = updated_state["state_history"][0]["timestamp"]
+    assert len(timestamp) == 20 and timestamp.endswith("Z")
+    assert not (pen_file.parent / "button-primary.state.json.tmp").exists()
 
 
 def test_update_state_validation_failure(temp_repo):
@@ -178,6 +341,36 @@ def test_update_state_force(temp_repo):
     assert result["to_state"] == "design_complete"
 
 
+def test_apply_state_update_recreates_removed_directory(temp_repo):
+    """Test a reused updater re-creates a state directory removed between writes."""
+    updater = ComponentStateUpdater(temp_repo)
+    assert updater.update_state("button-primary", "design_complete", force=True)["success"]
+    
+    components_dir = temp_repo / "harmony-design" / "components"
+    state = updater.get_component_state("button-primary")
+    shutil.rmtree(components_dir)
+    
+    result = updater._apply_state_update("button-primary", state, "implemented")
+    assert result["success"]
+    assert updater.get_component_state("button-primary")["state"] == "implemented"
+
+
+def test_update_state_pretty_output(temp_repo, monkeypatch):
+    """Test state files are compact by default and indented on request."""
+    updater = ComponentStateUpdater(temp_repo)
+    state_file = temp_repo / "harmony-design" / "components" / "button-primary.state.json"
+    
+    monkeypatch.delenv("HARMONY_PRETTY_STATE", raising=False)
+    updater.update_state("button-primary", "design_complete", force=True)
+    assert "\n" not in state_file.read_text()
+    
+    monkeypatch.setenv("HARMONY_PRETTY_STATE", "1")
+    updater.update_state("button-primary", "implemented", force=True)
+    content = state_file.read_text()
+    assert '\n  "state": "implemented"' in content
+    assert json.loads(content)["state"] == "implemented"
+
+
 def test_mcp_tool_entry_point(temp_repo):
     """Test the MCP tool entry point function."""
     # Create prerequisite file
@@ -191,4 +384,26 @@ def test_mcp_tool_entry_point(temp_repo):
     )
     
     assert result["success"]
-    assert result["component_id"] == "button-primary"
\ No newline at end of file
+    assert result["component_id"] == "button-primary"
+
+def test_package_export_survives_submodule_import():
+    """Test the package export stays the function after importing its submodule."""
+    # Fresh interpreter, so the import order matches the CLI's
+    code = (
+        "import tools.update_component_state\n"
+        "import tools\n"
+        "from tools import update_component_state\n"
+        "assert callable(update_component_state), type(update_component_state)\n"
+        "assert tools.update_component_state is update_component_state\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        check=True
+    )
+
+
+def test_tool_metadata_is_json_serializable():
+    """Test the MCP tool metadata serializes as-is."""
+    assert json.loads(json.dumps(TOOL_METADATA)) == TOOL_METADATA
+    assert TOOL_METADATA["name"] == "update_component_state"
@@ -11,9 +11,93 @@ See: harmony-design/DESIGN_SYSTEM.md#state-machine-validation
 
 import json
 import os
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+# Prefer C-accelerated JSON codecs when installed; stdlib json otherwise.
+# _dumps always returns UTF-8 bytes: compact by default, or with a
+# 2-space indent when pretty is set.
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    try:
+        import ujson
+
+        _loads = ujson.loads
+
+        def _dumps(obj: Any, pretty: bool = False) -> bytes:
+            return ujson.dumps(
+                obj, indent=2 if pretty else 0, escape_forward_slashes=False
+            ).encode("utf-8")
+    except ImportError:
+        _loads = json.loads
+
+        def _dumps(obj: Any, pretty: bool = False) -> bytes:
+            if pretty:
+                return json.dumps(obj, indent=2).encode("utf-8")
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _pretty_state() -> bool:
+    """Whether state files should be written indented (HARMONY_PRETTY_STATE=1)."""
+    return os.environ.get("HARMONY_PRETTY_STATE") == "1"
+
+
+# ISO 8601 UTC timestamp; the last formatted second is reused
+_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+_last_ts_second = -1
+_last_ts = ""
+
+
+@lru_cache(maxsize=32)
+def _load_json_cached(
+    path_str: str,
+    mtime_ns: int,
+    size: int,
+    inode: int
+) -> Dict[str, Any]:
+    """
+    Parse a JSON file, caching the result per (path, mtime, size, inode).
+    
+    The stat fields are part of the cache key so an edited file is re-read
+    on the next call; size and inode catch rewrites within one tick of a
+    coarse-mtime filesystem. Returned dicts are shared between callers
+    (the transition index relies on their identity), so they must be
+    treated as read-only.
+    
+    Args:
+        path_str: Path to the JSON file
+        mtime_ns: File modification time in nanoseconds
+        size: File size in bytes
+        inode: File inode number
+        
+    Returns:
+        Parsed JSON content
+    """
+    return _loads(Path(path_str).read_bytes())
+
+
+def _load_json_if_exists(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a JSON file through the stat cache (read-only result), or None if missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return _load_json_cached(str(path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+@lru_cache(maxsize=256)
+def _split_property_path(prop: str) -> tuple[str, ...]:
+    """Split a dotted property path, memoized across prerequisite checks."""
+    return tuple(prop.split("."))
+
 
 class ComponentStateUpdater:
     """
@@ -33,37 +117,86 @@ class ComponentStateUpdater:
         self.repo_root = repo_root
         self.state_machine_path = repo_root / "harmony-design" / "state-machine"
         self.components_path = repo_root / "harmony-design" / "components"
+        # (from_state, to_state) -> rule, rebuilt when the rules object changes
+        self._transition_index: Dict[tuple[str, str], Dict[str, Any]] = {}
+        self._indexed_rules: Optional[Dict[str, Any]] = None
+        # Directory listings for the validation in progress (see _prescan_dirs)
+        self._dir_cache: Dict[Path, set[str]] = {}
+        # component_id -> state file path
+        self._state_files: Dict[str, Path] = {}
+        # Prerequisite type -> checker
+        self._prereq_handlers = {
+            "file_exists": self._check_file_exists,
+            "property_set": self._check_property_set,
+            "linked_resources": self._check_linked_resources,
+        }
         
     def load_state_machine(self) -> Dict[str, Any]:
         """
         Load the state machine definition.
         
         Returns:
-            Dict containing state machine rules and transitions
+            Dict containing state machine rules and transitions (shared
+            cached object; do not mutate)
         """
         definition_file = self.state_machine_path / "definition.json"
-        if not definition_file.exists():
+        definition = _load_json_if_exists(definition_file)
+        if definition is None:
             return {
                 "states": ["draft", "design_complete", "implemented", "validated"],
                 "transitions": {}
             }
         
-        with open(definition_file, 'r') as f:
-            return json.load(f)
+        return definition
     
     def load_transition_rules(self) -> Dict[str, Any]:
         """
         Load transition validation rules.
         
         Returns:
-            Dict containing prerequisites for each transition
+            Dict containing prerequisites for each transition (shared
+            cached object; do not mutate)
         """
         rules_file = self.state_machine_path / "transition-rules.json"
-        if not rules_file.exists():
+        rules = _load_json_if_exists(rules_file)
+        if rules is None:
             return {"transitions": {}}
         
-        with open(rules_file, 'r') as f:
-            return json.load(f)
+        return rules
+    
+    def _get_transition_index(
+        self,
+        transition_rules: Dict[str, Any]
+    ) -> Dict[tuple[str, str], Dict[str, Any]]:
+        """
+        Index transition rules by (from_state, to_state).
+        
+        Loaded rules are shared through the mtime cache, so the index is
+        only rebuilt when a different rules object is passed in.
+        
+        Args:
+            transition_rules: Rules keyed as "<from>_to_<to>"
+            
+        Returns:
+            Dict mapping state pairs to their rule definitions
+        """
+        if transition_rules is not self._indexed_rules:
+            index = {}
+            for key, rule in transition_rules.get("transitions", {}).items():
+                from_state, sep, to_state = key.partition("_to_")
+                if sep:
+                    index[(from_state, to_state)] = rule
+            self._transition_index = index
+            self._indexed_rules = transition_rules
+        return self._transition_index
+    
+    def _state_file(self, component_id: str) -> Path:
+        """Get the (memoized) state file path for a component."""
+        state_file = self._state_files.get(component_id)
+        if state_file is None:
+            state_file = self.components_path / f"{component_id}.state.json"
+            self._state_files[component_id] = state_file
+        return state_file
     
     def get_component_state(self, component_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -75,19 +208,18 @@ class ComponentStateUpdater:
         Returns:
             Dict containing component state or None if not found
         """
-        state_file = self.components_path / f"{component_id}.state.json"
-        if not state_file.exists():
+        try:
+            return _loads(self._state_file(component_id).read_bytes())
+        except FileNotFoundError:
             return None
-        
-        with open(state_file, 'r') as f:
-            return json.load(f)
     
     def validate_transition(
         self,
         component_id: str,
         from_state: str,
         to_state: str,
-        transition_rules: Dict[str, Any]
+        transition_rules: Dict[str, Any],
+        component_state: Optional[Dict[str, Any]] = None
     ) -> tuple[bool, List[str]]:
         """
         Validate if a state transition is allowed.
@@ -97,6 +229,8 @@ class ComponentStateUpdater:
             from_state: Current state
             to_state: Target state
             transition_rules: Rules defining valid transitions
+            component_state: Already-loaded component state; read from
+                disk when omitted
             
         Returns:
             Tuple of (is_valid, list_of_errors)
@@ -104,25 +238,81 @@ class ComponentStateUpdater:
         errors = []
         
         # Check if transition exists in rules
-        transition_key = f"{from_state}_to_{to_state}"
-        if transition_key not in transition_rules.get("transitions", {}):
+        rule = self._get_transition_index(transition_rules).get((from_state, to_state))
+        if rule is None:
             errors.append(f"No transition defined from '{from_state}' to '{to_state}'")
             return False, errors
         
         # Check prerequisites
-        prerequisites = transition_rules["transitions"][transition_key].get("prerequisites", [])
-        component_state = self.get_component_state(component_id)
+        prerequisites = rule.get("prerequisites", [])
+        if component_state is None:
+            component_state = self.get_component_state(component_id)
         
         if not component_state:
             errors.append(f"Component '{component_id}' not found")
             return False, errors
         
-        for prereq in prerequisites:
-            if not self._check_prerequisite(component_id, prereq, component_state):
-                errors.append(f"Prerequisite not met: {prereq['description']}")
+        self._dir_cache = self._prescan_dirs(component_id, prerequisites)
+        try:
+            for prereq in prerequisites:
+                if not self._check_prerequisite(component_id, prereq, component_state):
+                    errors.append(f"Prerequisite not met: {prereq['description']}")
+        finally:
+            self._dir_cache = {}
         
         return len(errors) == 0, errors
     
+    def _resolve_prereq_path(
+        self,
+        component_id: str,
+        prerequisite: Dict[str, Any]
+    ) -> Path:
+        """Resolve a file_exists prerequisite path for a component."""
+        return self.repo_root / prerequisite["path"].format(
+            component_id=component_id
+        )
+    
+    def _prescan_dirs(
+        self,
+        component_id: str,
+        prerequisites: List[Dict[str, Any]]
+    ) -> Dict[Path, set[str]]:
+        """
+        List directories shared by several file_exists prerequisites.
+        
+        One scandir per shared directory replaces a stat() per file.
+        Directories referenced only once are left to a plain exists()
+        check, which is cheaper than listing them. Only entries that
+        exist() would accept are listed (broken symlinks are dropped).
+        
+        Args:
+            component_id: Component being checked
+            prerequisites: Prerequisites of the transition
+            
+        Returns:
+            Dict mapping directory paths to the entry names they contain
+        """
+        counts: Dict[Path, int] = {}
+        for prereq in prerequisites:
+            if prereq.get("type") == "file_exists":
+                parent = self._resolve_prereq_path(component_id, prereq).parent
+                counts[parent] = counts.get(parent, 0) + 1
+        
+        listings = {}
+        for parent, count in counts.items():
+            if count < 2:
+                continue
+            try:
+                with os.scandir(parent) as entries:
+                    # is_file/is_dir follow symlinks, like Path.exists()
+                    listings[parent] = {
+                        entry.name for entry in entries
+                        if entry.is_file() or entry.is_dir()
+                    }
+            except (FileNotFoundError, NotADirectoryError):
+                listings[parent] = set()
+        return listings
+    
     def _check_prerequisite(
         self,
         component_id: str,
@@ -140,29 +330,50 @@ class ComponentStateUpdater:
         Returns:
             True if prerequisite is satisfied
         """
-        prereq_type = prerequisite.get("type")
-        
-        if prereq_type == "file_exists":
-            file_path = self.repo_root / prerequisite["path"].format(
-                component_id=component_id
-            )
-            return file_path.exists()
-        
-        elif prereq_type == "property_set":
-            prop_path = prerequisite["property"].split(".")
-            value = component_state
-            for key in prop_path:
-                if key not in value:
-                    return False
-                value = value[key]
-            return value is not None
-        
-        elif prereq_type == "linked_resources":
-            links = component_state.get("links", {})
-            required_link_type = prerequisite["link_type"]
-            return required_link_type in links and len(links[required_link_type]) > 0
-        
-        return False
+        handler = self._prereq_handlers.get(prerequisite.get("type"))
+        if handler is None:
+            return False
+        return handler(component_id, prerequisite, component_state)
+    
+    def _check_file_exists(
+        self,
+        component_id: str,
+        prerequisite: Dict[str, Any],
+        component_state: Dict[str, Any]
+    ) -> bool:
+        """Check a file_exists prerequisite."""
+        file_path = self._resolve_prereq_path(component_id, prerequisite)
+        names = self._dir_cache.get(file_path.parent)
+        if names is not None and file_path.name in names:
+            return True
+        # A listing miss is not proof of absence: the name may differ in
+        # case on a case-insensitive filesystem, or be '..'
+        return file_path.exists()
+    
+    def _check_property_set(
+        self,
+        component_id: str,
+        prerequisite: Dict[str, Any],
+        component_state: Dict[str, Any]
+    ) -> bool:
+        """Check a property_set prerequisite (dotted property path)."""
+        value = component_state
+        for key in _split_property_path(prerequisite["property"]):
+            if key not in value:
+                return False
+            value = value[key]
+        return value is not None
+    
+    def _check_linked_resources(
+        self,
+        component_id: str,
+        prerequisite: Dict[str, Any],
+        component_state: Dict[str, Any]
+    ) -> bool:
+        """Check a linked_resources prerequisite."""
+        links = component_state.get("links", {})
+        required_link_type = prerequisite["link_type"]
+        return required_link_type in links and len(links[required_link_type]) > 0
     
     def update_state(
         self,
@@ -202,7 +413,8 @@ class ComponentStateUpdater:
             component_id,
             current_state,
             new_state,
-            transition_rules
+            transition_rules,
+            component_state
         )
         
         if not is_valid:
@@ -236,20 +448,24 @@ class ComponentStateUpdater:
             Dict containing success result
         """
         old_state = component_state.get("state", "draft")
-        component_state["state"] = new_state
-        component_state["state_history"] = component_state.get("state_history", [])
-        component_state["state_history"].append({
+        component_state.setdefault("state_history", []).append({
             "from": old_state,
             "to": new_state,
             "timestamp": self._get_timestamp()
         })
+        component_state["state"] = new_state
         
         # Write updated state
-        state_file = self.components_path / f"{component_id}.state.json"
+        state_file = self._state_file(component_id)
+        # Not memoized: the updater is shared process-wide (_get_updater) and
+        # the directory may be removed between writes; this is one stat
+        # when it exists
         state_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(state_file, 'w') as f:
-            json.dump(component_state, f, indent=2)
+        # Serialize once, then swap in atomically so readers never see a partial file
+        tmp_file = state_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(_dumps(component_state, pretty=_pretty_state()))
+        os.replace(tmp_file, state_file)
         
         return {
             "success": True,
@@ -260,9 +476,24 @@ class ComponentStateUpdater:
         }
     
     def _get_timestamp(self) -> str:
-        """Get ISO format timestamp."""
-        from datetime import datetime
-        return datetime.utcnow().isoformat() + "Z"
+        """Get ISO format UTC timestamp (second precision)."""
+        global _last_ts_second, _last_ts
+        second = int(time.time())
+        if second != _last_ts_second:
+            _last_ts = time.strftime(_TIMESTAMP_FORMAT, time.gmtime(second))
+            _last_ts_second = second
+        return _last_ts
+
+
+@lru_cache(maxsize=4)
+def _get_updater(repo_root: str) -> ComponentStateUpdater:
+    """
+    Get a shared updater for a repository root.
+    
+    Long-running MCP servers call the tool many times per process;
+    reusing the updater keeps its transition index and caches warm.
+    """
+    return ComponentStateUpdater(Path(repo_root))
 
 
 def update_component_state(
@@ -291,11 +522,11 @@ def update_component_state(
     if repo_root is None:
         repo_root = os.getcwd()
     
-    updater = ComponentStateUpdater(Path(repo_root))
+    updater = _get_updater(repo_root)
     return updater.update_state(component_id, new_state, force)
 
 
-# MCP tool metadata
+# MCP tool metadata; a plain dict so it can be passed straight to a JSON serializer
 TOOL_METADATA = {
     "name": "update_component_state",
     "description": "Update component state with automatic validation against state machine rules",
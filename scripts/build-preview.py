@@ -6,113 +6,34 @@ This script creates a production-ready bundle for preview environments
 including all necessary static assets, WASM modules, and HTML pages.
 
 Usage:
-    python scripts/build-preview.py [--output dist]
+    python scripts/build-preview.py [--output dist] [--hardlink] [--zip]
 """
 
 import os
 import shutil
 import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json fallback
+    orjson = None
 
-class PreviewBuilder:
-    """Builds preview deployment bundles."""
-    
-    def __init__(self, output_dir="dist"):
-        """
-        Initialize builder.
-        
-        Args:
-            output_dir: Output directory for built files
-        """
-        self.output_dir = Path(output_dir)
-        self.root_dir = Path(__file__).parent.parent
-        
-    def build(self):
-        """Execute full build pipeline."""
-        print("🏗️  Building preview deployment...")
-        
-        self._clean_output()
-        self._copy_static_assets()
-        self._copy_components()
-        self._copy_core_modules()
-        self._generate_index()
-        self._generate_manifest()
-        self._generate_performance_page()
-        self._generate_storybook_index()
-        
-        print("✅ Preview build complete!")
-        print(f"📦 Output: {self.output_dir}")
-        
-    def _clean_output(self):
-        """Clean output directory."""
-        if self.output_dir.exists():
-            shutil.rmtree(self.output_dir)
-        self.output_dir.mkdir(parents=True)
-        
-    def _copy_static_assets(self):
-        """Copy static HTML, CSS, and demo files."""
-        print("📄 Copying static assets...")
-        
-        # Copy demo HTML files
-        for html_file in self.root_dir.glob("demo-*.html"):
-            shutil.copy(html_file, self.output_dir / html_file.name)
-        
-        # Copy styles
-        styles_dir = self.root_dir / "styles"
-        if styles_dir.exists():
-            shutil.copytree(styles_dir, self.output_dir / "styles")
-        
-        # Copy tokens
-        tokens_dir = self.root_dir / "tokens"
-        if tokens_dir.exists():
-            shutil.copytree(tokens_dir, self.output_dir / "tokens")
-            
-    def _copy_components(self):
-        """Copy all component JavaScript files."""
-        print("🧩 Copying components...")
-        
-        components_src = self.root_dir / "components"
-        components_dst = self.output_dir / "components"
-        
-        if components_src.exists():
-            shutil.copytree(
-                components_src,
-                components_dst,
-                ignore=shutil.ignore_patterns("*.test.html", "*.test.js")
-            )
-            
-        # Copy controls
-        controls_src = self.root_dir / "controls"
-        controls_dst = self.output_dir / "controls"
-        
-        if controls_src.exists():
-            shutil.copytree(
-                controls_src,
-                controls_dst,
-                ignore=shutil.ignore_patterns("*.test.html", "*.test.js")
-            )
-            
-    def _copy_core_modules(self):
-        """Copy core system modules."""
-        print("⚙️  Copying core modules...")
-        
-        core_src = self.root_dir / "core"
-        core_dst = self.output_dir / "core"
-        
-        if core_src.exists():
-            shutil.copytree(
-                core_src,
-                core_dst,
-                ignore=shutil.ignore_patterns("*.test.js", "*.test.html")
-            )
-            
-    def _generate_index(self):
-        """Generate main index.html for preview."""
-        print("📝 Generating index.html...")
-        
-        index_html = """<!DOCTYPE html>
+
+def _dump_json_bytes(data):
+    """Serialize data as 2-space indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+# Page templates, built once at import. The index has a single {build_time}
+# slot filled with str.replace (the CSS/JS braces rule out str.format);
+# the other pages are static and kept pre-encoded.
+_INDEX_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -204,56 +125,15 @@ class PreviewBuilder:
         
         <div class="meta">
             <strong>Build Info:</strong><br>
-            Built: """ + datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC') + """<br>
+            Built: {build_time}<br>
             Environment: Preview Deployment
         </div>
     </div>
 </body>
 </html>
 """
-        
-        (self.output_dir / "index.html").write_text(index_html)
-        
-    def _generate_manifest(self):
-        """Generate deployment manifest."""
-        print("📋 Generating manifest...")
-        
-        manifest = {
-            "name": "Harmony Design System",
-            "version": "preview",
-            "buildTime": datetime.utcnow().isoformat() + "Z",
-            "components": self._list_components(),
-            "performance": {
-                "loadBudget": "200ms",
-                "renderBudget": "16ms",
-                "memoryBudget": "50MB"
-            }
-        }
-        
-        (self.output_dir / "manifest.json").write_text(
-            json.dumps(manifest, indent=2)
-        )
-        
-    def _list_components(self):
-        """List all available components."""
-        components = []
-        
-        components_dir = self.output_dir / "components"
-        if components_dir.exists():
-            for js_file in components_dir.rglob("*.js"):
-                rel_path = js_file.relative_to(self.output_dir)
-                components.append(str(rel_path))
-                
-        return components
-        
-    def _generate_performance_page(self):
-        """Generate performance monitoring page."""
-        print("⚡ Generating performance page...")
-        
-        perf_dir = self.output_dir / "_performance"
-        perf_dir.mkdir(exist_ok=True)
-        
-        perf_html = """<!DOCTYPE html>
+
+_PERFORMANCE_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -344,18 +224,9 @@ class PreviewBuilder:
     </div>
 </body>
 </html>
-"""
-        
-        (perf_dir / "index.html").write_text(perf_html)
-        
-    def _generate_storybook_index(self):
-        """Generate component storybook index."""
-        print("🧪 Generating storybook...")
-        
-        storybook_dir = self.output_dir / "_storybook"
-        storybook_dir.mkdir(exist_ok=True)
-        
-        storybook_html = """<!DOCTYPE html>
+""".encode("utf-8")
+
+_STORYBOOK_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -430,9 +301,239 @@ class PreviewBuilder:
     </script>
 </body>
 </html>
-"""
+""".encode("utf-8")
+
+
+def _link_or_copy(src, dst):
+    """Hardlink src to dst, copying instead when linking is not possible."""
+    try:
+        os.link(src, dst)
+    except OSError:  # cross-device, unsupported filesystem, permissions
+        shutil.copy2(src, dst)
+    return dst
+
+
+class PreviewBuilder:
+    """Builds preview deployment bundles."""
+    
+    def __init__(self, output_dir="dist", hardlink=False, zip_output=False):
+        """
+        Initialize builder.
+        
+        Args:
+            output_dir: Output directory for built files
+            hardlink: Hardlink copied files instead of copying bytes. The
+                bundle then shares inodes with the sources, so editing a
+                source file also changes the bundle.
+            zip_output: Write the whole bundle into output_dir/dist.zip in
+                one streaming pass instead of as individual files
+        """
+        self.output_dir = Path(output_dir)
+        self.root_dir = Path(__file__).parent.parent
+        self.copy_function = _link_or_copy if hardlink else shutil.copy2
+        self.zip_output = zip_output
+        self._zip = None
+        
+    def build(self):
+        """Execute full build pipeline."""
+        print("🏗️  Building preview deployment...")
+        
+        self._clean_output()
+        
+        if self.zip_output:
+            self._zip = zipfile.ZipFile(
+                self.output_dir / "dist.zip", "w", zipfile.ZIP_DEFLATED
+            )
+        try:
+            self._copy_sources()
+            self._generate_index()
+            self._generate_manifest()
+            self._generate_performance_page()
+            self._generate_storybook_index()
+        finally:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+        
+        print("✅ Preview build complete!")
+        print(f"📦 Output: {self.output_dir}")
+        
+    def _copy_sources(self):
+        """Copy static assets, components and core modules into the bundle."""
+        copy_steps = [
+            self._copy_static_assets,
+            self._copy_components,
+            self._copy_core_modules,
+        ]
+        
+        # ZipFile is not safe for concurrent writers
+        if self._zip is not None:
+            for step in copy_steps:
+                step()
+            return
+        
+        # Independent subtrees: copy concurrently so disk I/O overlaps
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            copies = [executor.submit(step) for step in copy_steps]
+            for future in copies:
+                future.result()  # re-raise any copy failure
+        
+    def _clean_output(self):
+        """Clean output directory."""
+        if self.output_dir.exists():
+            shutil.rmtree(self.output_dir)
+        self.output_dir.mkdir(parents=True)
+        
+    def _copy_file(self, src, rel_path):
+        """Copy one file to rel_path inside the bundle."""
+        if self._zip is not None:
+            self._zip.write(src, arcname=rel_path)
+        else:
+            self.copy_function(src, self.output_dir / rel_path)
+            
+    def _copy_tree(self, src, rel_path, ignore=None):
+        """Copy a directory tree to rel_path inside the bundle."""
+        if self._zip is None:
+            shutil.copytree(
+                src,
+                self.output_dir / rel_path,
+                ignore=ignore,
+                copy_function=self.copy_function
+            )
+            return
+        
+        for root, dirs, files in os.walk(src):
+            if ignore is not None:
+                ignored = ignore(root, dirs + files)
+                dirs[:] = [d for d in dirs if d not in ignored]
+                files = [f for f in files if f not in ignored]
+            rel_root = os.path.relpath(root, src)
+            for name in files:
+                arcname = os.path.normpath(os.path.join(rel_path, rel_root, name))
+                self._zip.write(os.path.join(root, name), arcname=arcname)
+                
+    def _write_bytes(self, rel_path, data):
+        """Write generated content to rel_path inside the bundle."""
+        if self._zip is not None:
+            self._zip.writestr(rel_path, data)
+            return
+        target = self.output_dir / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        
+    def _copy_static_assets(self):
+        """Copy static HTML, CSS, and demo files."""
+        print("📄 Copying static assets...")
+        
+        # Copy demo HTML files
+        for html_file in self.root_dir.glob("demo-*.html"):
+            self._copy_file(html_file, html_file.name)
+        
+        # Copy styles
+        styles_dir = self.root_dir / "styles"
+        if styles_dir.exists():
+            self._copy_tree(styles_dir, "styles")
+        
+        # Copy tokens
+        tokens_dir = self.root_dir / "tokens"
+        if tokens_dir.exists():
+            self._copy_tree(tokens_dir, "tokens")
+            
+    def _copy_components(self):
+        """Copy all component JavaScript files."""
+        print("🧩 Copying components...")
+        
+        components_src = self.root_dir / "components"
         
-        (storybook_dir / "index.html").write_text(storybook_html)
+        if components_src.exists():
+            self._copy_tree(
+                components_src,
+                "components",
+                ignore=shutil.ignore_patterns("*.test.html", "*.test.js")
+            )
+            
+        # Copy controls
+        controls_src = self.root_dir / "controls"
+        
+        if controls_src.exists():
+            self._copy_tree(
+                controls_src,
+                "controls",
+                ignore=shutil.ignore_patterns("*.test.html", "*.test.js")
+            )
+            
+    def _copy_core_modules(self):
+        """Copy core system modules."""
+        print("⚙️  Copying core modules...")
+        
+        core_src = self.root_dir / "core"
+        
+        if core_src.exists():
+            self._copy_tree(
+                core_src,
+                "core",
+                ignore=shutil.ignore_patterns("*.test.js", "*.test.html")
+            )
+            
+    def _generate_index(self):
+        """Generate main index.html for preview."""
+        print("📝 Generating index.html...")
+        
+        build_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+        index_html = _INDEX_TEMPLATE.replace("{build_time}", build_time)
+        self._write_bytes("index.html", index_html.encode("utf-8"))
+        
+    def _generate_manifest(self):
+        """Generate deployment manifest."""
+        print("📋 Generating manifest...")
+        
+        manifest = {
+            "name": "Harmony Design System",
+            "version": "preview",
+            "buildTime": datetime.utcnow().isoformat() + "Z",
+            "components": self._list_components(),
+            "performance": {
+                "loadBudget": "200ms",
+                "renderBudget": "16ms",
+                "memoryBudget": "50MB"
+            }
+        }
+        
+        self._write_bytes("manifest.json", _dump_json_bytes(manifest))
+        
+    def _list_components(self):
+        """List all available components."""
+        if self._zip is not None:
+            return [
+                name for name in self._zip.namelist()
+                if name.startswith("components/") and name.endswith(".js")
+            ]
+        
+        components = []
+        
+        components_dir = self.output_dir / "components"
+        output_dir = str(self.output_dir)
+        # os.walk yields plain names from scandir; no Path objects or extra stat per file
+        for root, _dirs, files in os.walk(components_dir):
+            for name in files:
+                if name.endswith(".js"):
+                    components.append(
+                        os.path.relpath(os.path.join(root, name), output_dir)
+                    )
+                
+        return components
+        
+    def _generate_performance_page(self):
+        """Generate performance monitoring page."""
+        print("⚡ Generating performance page...")
+        
+        self._write_bytes("_performance/index.html", _PERFORMANCE_HTML)
+        
+    def _generate_storybook_index(self):
+        """Generate component storybook index."""
+        print("🧪 Generating storybook...")
+        
+        self._write_bytes("_storybook/index.html", _STORYBOOK_HTML)
 
 
 def main():
@@ -447,10 +548,26 @@ def main():
         default="dist",
         help="Output directory (default: dist)"
     )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Hardlink files into the bundle instead of copying (same filesystem only; "
+             "source edits will show up in the bundle)"
+    )
+    
+    parser.add_argument(
+        "--zip",
+        action="store_true",
+        help="Write the bundle as a single dist.zip inside the output directory"
+    )
     
     args = parser.parse_args()
     
-    builder = PreviewBuilder(output_dir=args.output)
+    builder = PreviewBuilder(
+        output_dir=args.output,
+        hardlink=args.hardlink,
+        zip_output=args.zip
+    )
     builder.build()
 
 
@@ -2,74 +2,346 @@
 """
 Lighthouse performance check for preview deployments.
 
-This script would integrate with Lighthouse CI to verify performance budgets.
-For the preview implementation, it provides a structure for performance validation.
+Runs the Lighthouse CLI against one or more URLs (in parallel) and checks the
+results against a performance budget. The budget file is either this repo's
+format (.github/performance-budget.json: named metric budgets plus category
+score thresholds) or a Lightwallet budget array, which is handed to
+Lighthouse via --budget-path and evaluated from its budget audits.
+
+Requires the Lighthouse CLI on PATH (npm install -g lighthouse).
 
 Usage:
-    python scripts/lighthouse-check.py --url https://preview.url --budget-file budget.json
+    python scripts/lighthouse-check.py --url https://preview.url [--url ...] --budget-file budget.json
 """
 
 import argparse
+import asyncio
 import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json fallback
+    orjson = None
+
+
+def _dump_json_bytes(data):
+    """Serialize data as 2-space indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+LIGHTHOUSE = "lighthouse"
+
+# Lighthouse's own convention for choosing the Chrome binary
+CHROME = os.environ.get("CHROME_PATH", "google-chrome")
+DEBUG_PORT = 9222
+
+DEFAULT_BUDGET = {
+    "loadTime": 200,
+    "firstPaint": 100,
+    "interactive": 300
+}
+
+# Lightwallet audits whose items list the resources/timings over budget
+BUDGET_AUDITS = ("performance-budget", "timing-budget")
+
+
+def _budget_limits(budget):
+    """
+    Metric name -> limit from either {"budgets": {name: {"value": n}}} or a
+    flat {name: n} mapping.
+    """
+    entries = budget.get("budgets", budget)
+    limits = {}
+    for name, entry in entries.items():
+        value = entry.get("value") if isinstance(entry, dict) else entry
+        if isinstance(value, (int, float)):
+            limits[name] = value
+    return limits
+
+
+def _audit_items(report, audit_id):
+    audit = report.get("audits", {}).get(audit_id) or {}
+    return (audit.get("details") or {}).get("items") or []
+
+
+def _extract_metrics(report):
+    """Map Lighthouse audits onto the budget's metric names (ms)."""
+    observed = (_audit_items(report, "metrics") or [{}])[0]
+    interactive = report.get("audits", {}).get("interactive") or {}
+
+    metrics = {
+        "loadTime": observed.get("observedLoad"),
+        "firstPaint": observed.get("observedFirstPaint"),
+        "interactive": interactive.get("numericValue"),
+    }
+    return {
+        name: round(value)
+        for name, value in metrics.items()
+        if isinstance(value, (int, float))
+    }
+
+
+def _budget_audit_violations(report):
+    """Collect over-budget items from Lightwallet's budget audits."""
+    violations = []
+    for audit_id in BUDGET_AUDITS:
+        for item in _audit_items(report, audit_id):
+            over = (
+                item.get("overBudget")
+                or item.get("sizeOverBudget")
+                or item.get("countOverBudget")
+            )
+            if over:
+                label = item.get("label") or item.get("metric") or item.get("resourceType")
+                violations.append(f"{audit_id}: {label} over budget by {over}")
+    return violations
+
+
+def _evaluate(url, lighthouse_report, limits, thresholds):
+    """Build the per-URL result from a Lighthouse JSON report."""
+    metrics = _extract_metrics(lighthouse_report)
+    violations = _budget_audit_violations(lighthouse_report)
+
+    # Budgets Lighthouse cannot measure (frame time, WASM heap) are skipped
+    for name, limit in limits.items():
+        value = metrics.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name}: {value}ms exceeds {limit}ms budget")
+
+    category = lighthouse_report.get("categories", {}).get("performance") or {}
+    score = category.get("score")
+    performance_score = round(score * 100) if score is not None else None
+    min_score = thresholds.get("performance")
+    if performance_score is not None and min_score is not None and performance_score < min_score:
+        violations.append(
+            f"performance score {performance_score} below threshold {min_score}"
+        )
+
+    return {
+        "url": url,
+        "metrics": metrics,
+        "performanceScore": performance_score,
+        "violations": violations,
+        "passed": not violations
+    }
+
+
+class ChromePool:
+    """
+    Warm headless Chrome instances for Lighthouse to attach to via --port.
+
+    Use as a context manager; Chrome starts once per instance on entry and is
+    reused for every audit until exit. Lighthouse cannot audit two pages in
+    one Chrome at the same time, so there is one instance per parallel run.
+    If Chrome cannot be started, ports is empty and Lighthouse launches its
+    own browser per run as before.
+    """
+
+    def __init__(self, size, base_port=DEBUG_PORT, startup_timeout=10):
+        self.size = size
+        self.base_port = base_port
+        self.startup_timeout = startup_timeout
+        self.ports = []
+        self._processes = []
+        self._profile_dirs = []
+
+    def __enter__(self):
+        for port in range(self.base_port, self.base_port + self.size):
+            profile_dir = tempfile.mkdtemp(prefix="lighthouse-chrome-")
+            self._profile_dirs.append(profile_dir)
+            try:
+                process = subprocess.Popen(
+                    [
+                        CHROME,
+                        "--headless",
+                        "--disable-gpu",
+                        "--no-sandbox",
+                        f"--remote-debugging-port={port}",
+                        f"--user-data-dir={profile_dir}",
+                        "about:blank"
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError:
+                break  # no Chrome here; let Lighthouse launch its own
+            self._processes.append(process)
+            if self._wait_for_port(process, port):
+                self.ports.append(port)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for profile_dir in self._profile_dirs:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        self._processes = []
+        self._profile_dirs = []
+        self.ports = []
+
+    def _wait_for_port(self, process, port):
+        """Wait for the DevTools endpoint; False if Chrome never came up."""
+        endpoint = f"http://localhost:{port}/json/version"
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                with urllib.request.urlopen(endpoint, timeout=1):
+                    return True
+            except OSError:
+                time.sleep(0.05)
+        return False
+
+
+async def _run_lighthouse(url, budget_path, slots):
+    """Run Lighthouse for one URL and return its parsed JSON report."""
+    cmd = [
+        LIGHTHOUSE,
+        url,
+        "--output=json",
+        "--output-path=stdout",
+        "--only-categories=performance",
+        "--quiet",
+    ]
+    if budget_path:
+        cmd.append(f"--budget-path={budget_path}")
+
+    # A slot is a warm Chrome's debugging port, or None to let Lighthouse
+    # start its own browser
+    port = await slots.get()
+    try:
+        if port is None:
+            cmd.append("--chrome-flags=--headless")
+        else:
+            cmd.append(f"--port={port}")
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+    finally:
+        slots.put_nowait(port)
+
+    if proc.returncode != 0:
+        message = stderr.decode(errors="replace").strip() or f"exit code {proc.returncode}"
+        raise RuntimeError(f"lighthouse failed for {url}: {message}")
+    return json.loads(stdout)
 
 
-def check_performance(url, budget_file, output_file):
+async def _run_all(urls, budget_path):
+    # Each run drives its own Chrome; leave headroom for the browsers
+    parallelism = min(len(urls), max(1, (os.cpu_count() or 2) // 2))
+
+    with ChromePool(parallelism) as chrome:
+        slots = asyncio.Queue()
+        for port in chrome.ports or [None] * parallelism:
+            slots.put_nowait(port)
+        return await asyncio.gather(
+            *(_run_lighthouse(url, budget_path, slots) for url in urls),
+            return_exceptions=True
+        )
+
+
+def check_performance(urls, budget_file, output_file):
     """
     Check performance against budget.
-    
+
     Args:
-        url: URL to test
+        urls: URL, or list of URLs, to test
         budget_file: Path to budget JSON
         output_file: Path to output report
     """
-    print(f"🔍 Checking performance for: {url}")
-    
+    if isinstance(urls, str):
+        urls = [urls]
+
+    for url in urls:
+        print(f"🔍 Checking performance for: {url}")
+
     # Load budget
     if Path(budget_file).exists():
         with open(budget_file) as f:
             budget = json.load(f)
     else:
-        budget = {
-            "loadTime": 200,
-            "firstPaint": 100,
-            "interactive": 300
+        budget = DEFAULT_BUDGET
+
+    if isinstance(budget, list):
+        # Lightwallet budget: Lighthouse evaluates it itself
+        budget_path, limits, thresholds = budget_file, {}, {}
+    else:
+        budget_path = None
+        limits = _budget_limits(budget)
+        thresholds = budget.get("thresholds", {})
+
+    lighthouse_reports = asyncio.run(_run_all(urls, budget_path))
+
+    results = []
+    for url, lighthouse_report in zip(urls, lighthouse_reports):
+        if isinstance(lighthouse_report, FileNotFoundError):
+            print(f"❌ '{LIGHTHOUSE}' not found; install it with: npm install -g lighthouse")
+            return 1
+        if isinstance(lighthouse_report, Exception):
+            results.append({
+                "url": url,
+                "error": str(lighthouse_report),
+                "violations": [str(lighthouse_report)],
+                "passed": False
+            })
+        else:
+            results.append(_evaluate(url, lighthouse_report, limits, thresholds))
+
+    timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    passed = all(result["passed"] for result in results)
+
+    if len(results) == 1:
+        report = {
+            **results[0],
+            "timestamp": timestamp,
+            "budget": budget,
+            "details": "Performance check completed"
         }
-    
-    # In real implementation, this would run Lighthouse
-    # For now, create a placeholder report structure
-    report = {
-        "url": url,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "budget": budget,
-        "metrics": {
-            "loadTime": 150,  # Placeholder
-            "firstPaint": 80,  # Placeholder
-            "interactive": 250  # Placeholder
-        },
-        "passed": True,  # Placeholder
-        "details": "Performance check completed"
-    }
-    
-    # Check against budget
-    report["passed"] = report["metrics"]["loadTime"] <= budget["loadTime"]
-    
+    else:
+        report = {
+            "timestamp": timestamp,
+            "budget": budget,
+            "passed": passed,
+            "results": results
+        }
+
     # Write report
     output_path = Path(output_file)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w') as f:
-        json.dump(report, f, indent=2)
-    
+
+    output_path.write_bytes(_dump_json_bytes(report))
+
     print(f"✅ Report written to: {output_path}")
-    
-    if report["passed"]:
+
+    for result in results:
+        for violation in result["violations"]:
+            print(f"  ✗ {result['url']}: {violation}")
+
+    if passed:
         print("✅ Performance budget: PASSED")
     else:
         print("❌ Performance budget: FAILED")
         return 1
-    
+
     return 0
 
 
@@ -81,7 +353,8 @@ def main():
     parser.add_argument(
         "--url",
         required=True,
-        help="URL to test"
+        action="append",
+        help="URL to test (repeat to test several in parallel)"
     )
     parser.add_argument(
         "--budget-file",
@@ -93,11 +366,11 @@ def main():
         default="reports/lighthouse-report.json",
         help="Output report path"
     )
-    
+
     args = parser.parse_args()
-    
+
     exit(check_performance(args.url, args.budget_file, args.output))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
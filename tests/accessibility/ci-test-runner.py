@@ -4,60 +4,180 @@ CI test runner for accessibility tests
 
 Runs axe-core tests in headless Chrome and reports results.
 This is a dev tool - NOT production code.
+
+Chrome is started once and driven over the DevTools Protocol (CDP)
+when the `websockets` package is installed (pip install websockets);
+without it each page is loaded with `google-chrome --dump-dom`.
 """
 
 import json
+import socket
 import subprocess
 import sys
 import time
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from threading import Thread
 
+try:
+    from websockets.sync.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
 
 def start_test_server(port=8000):
     """Start a simple HTTP server for testing"""
     class Handler(SimpleHTTPRequestHandler):
+        # Keep-alive so the page's CSS/JS/axe-core requests reuse connections
+        protocol_version = "HTTP/1.1"
+        
         def log_message(self, format, *args):
             pass  # Suppress logs
     
-    server = HTTPServer(('localhost', port), Handler)
+    # Threaded so concurrent resource requests don't queue behind each other
+    server = ThreadingHTTPServer(('localhost', port), Handler)
     thread = Thread(target=server.serve_forever, daemon=True)
     thread.start()
     print(f"✓ Test server started on http://localhost:{port}")
     return server
 
 
-def run_headless_tests(port=8000):
-    """Run tests in headless Chrome"""
-    test_url = f"http://localhost:{port}/harmony-design/tests/accessibility/test-all-components.html"
+def wait_for_server(port=8000, timeout=2.0):
+    """Poll until the test server accepts connections; True if it did"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('localhost', port)) == 0:
+                return True
+        time.sleep(0.01)
+    return False
+
+
+class ChromeSession:
+    """
+    Long-lived headless Chrome controlled over the DevTools Protocol.
     
-    # Chrome command to run tests
-    chrome_cmd = [
-        'google-chrome',
-        '--headless',
-        '--disable-gpu',
-        '--no-sandbox',
-        '--dump-dom',
-        test_url
-    ]
+    Use as a context manager; Chrome starts on entry and is reused for
+    every page load until exit, so startup is paid once per CI run.
+    """
     
-    try:
-        print("Running accessibility tests in headless Chrome...")
-        result = subprocess.run(
-            chrome_cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+    def __init__(self, debug_port=9222, startup_timeout=10):
+        self.debug_port = debug_port
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.ws = None
+        self._next_id = 0
+    
+    def __enter__(self):
+        if ws_connect is None:
+            raise RuntimeError("websockets not installed (pip install websockets)")
         
-        # Parse results from DOM output
-        # This is a simplified version - real implementation would need
-        # to execute JS and capture test results
-        print(result.stdout)
-        return True
+        self.process = subprocess.Popen(
+            [
+                'google-chrome',
+                '--headless',
+                '--disable-gpu',
+                '--no-sandbox',
+                f'--remote-debugging-port={self.debug_port}',
+                'about:blank'
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            self.ws = ws_connect(self._page_ws_url(), max_size=None)
+            self.send('Page.enable')
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self.ws is not None:
+            self.ws.close()
+            self.ws = None
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+    
+    def _page_ws_url(self):
+        """Wait for the debugging endpoint and return the page target's URL."""
+        endpoint = f"http://localhost:{self.debug_port}/json/list"
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Chrome exited during startup")
+            try:
+                with urllib.request.urlopen(endpoint, timeout=1) as response:
+                    targets = json.load(response)
+                for target in targets:
+                    if target.get('type') == 'page':
+                        return target['webSocketDebuggerUrl']
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise TimeoutError("Chrome DevTools endpoint did not come up")
+    
+    def send(self, method, params=None, timeout=30):
+        """Send a CDP command and return its result."""
+        self._next_id += 1
+        message_id = self._next_id
+        self.ws.send(json.dumps({
+            'id': message_id,
+            'method': method,
+            'params': params or {}
+        }))
+        while True:
+            message = json.loads(self.ws.recv(timeout=timeout))
+            if message.get('id') == message_id:
+                if 'error' in message:
+                    raise RuntimeError(f"{method} failed: {message['error']}")
+                return message.get('result', {})
+    
+    def _wait_for_event(self, method, timeout=30):
+        """Block until the given CDP event arrives."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for {method}")
+            message = json.loads(self.ws.recv(timeout=remaining))
+            if message.get('method') == method:
+                return message.get('params', {})
+    
+    def navigate(self, url, timeout=30):
+        """Load a URL and wait for its load event."""
+        self.send('Page.navigate', {'url': url}, timeout=timeout)
+        self._wait_for_event('Page.loadEventFired', timeout=timeout)
+    
+    def evaluate(self, expression, timeout=30):
+        """Evaluate a JS expression in the page and return its value."""
+        result = self.send('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': True
+        }, timeout=timeout)
+        return result.get('result', {}).get('value')
+
+
+def run_headless_tests(port=8000, session=None):
+    """Run tests in headless Chrome, reusing session if given"""
+    test_url = f"http://localhost:{port}/harmony-design/tests/accessibility/test-all-components.html"
+    
+    try:
+        if session is None:
+            if ws_connect is None:
+                return _run_dump_dom(test_url)
+            with ChromeSession() as session:
+                return _run_in_session(session, test_url)
+        return _run_in_session(session, test_url)
         
-    except subprocess.TimeoutExpired:
+    except (TimeoutError, subprocess.TimeoutExpired):
         print("✗ Tests timed out")
         return False
     except FileNotFoundError:
@@ -68,17 +188,64 @@ def run_headless_tests(port=8000):
         return False
 
 
+def _run_in_session(session, test_url):
+    """Load the test page in an open Chrome session and print its DOM"""
+    print("Running accessibility tests in headless Chrome...")
+    session.navigate(test_url)
+    
+    # Parse results from DOM output
+    # This is a simplified version - real implementation would need
+    # to execute JS and capture test results
+    print(session.evaluate('document.documentElement.outerHTML'))
+    return True
+
+
+def _run_dump_dom(test_url):
+    """Load the test page with a one-off `--dump-dom` Chrome and print its DOM"""
+    print("Running accessibility tests in headless Chrome...")
+    result = subprocess.run(
+        [
+            'google-chrome',
+            '--headless',
+            '--disable-gpu',
+            '--no-sandbox',
+            '--dump-dom',
+            test_url
+        ],
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+    print(result.stdout)
+    return True
+
+
 def main():
     """Main entry point"""
     print("=== Harmony Design System Accessibility Tests ===\n")
     
     # Start server
     server = start_test_server()
-    time.sleep(1)  # Give server time to start
+    if not wait_for_server():
+        print("✗ Test server did not start")
+        server.shutdown()
+        return 1
     
     try:
         # Run tests
-        success = run_headless_tests()
+        try:
+            if ws_connect is None:
+                print("websockets not installed; falling back to --dump-dom")
+                success = run_headless_tests()
+            else:
+                with ChromeSession() as session:
+                    success = run_headless_tests(session=session)
+        except FileNotFoundError:
+            print("✗ Chrome not found. Install Chrome or use alternative browser.")
+            success = False
+        except Exception as e:
+            print(f"✗ Error starting Chrome: {e}")
+            success = False
         
         if success:
             print("\n✓ All accessibility tests passed")
@@ -8,10 +8,19 @@ for visual regression testing of Harmony Design System components.
 import pytest
 import os
 import json
+from io import BytesIO
 from pathlib import Path
-from PIL import Image, ImageChops
+import numpy as np
+from PIL import Image
 from playwright.sync_api import Page, Browser, sync_playwright
 
+# pyvips is optional; when installed, passing comparisons are decoded and
+# diffed by libvips in one streamed pass instead of via PIL and numpy
+try:
+    import pyvips
+except (ImportError, OSError):  # OSError: pyvips installed without libvips
+    pyvips = None
+
 
 # Test configuration
 VIEWPORT_WIDTH = 1280
@@ -59,9 +68,9 @@ def browser(playwright_instance):
     browser.close()
 
 
-@pytest.fixture
-def page(browser: Browser):
-    """Create a new page for each test."""
+@pytest.fixture(scope="session")
+def session_page(browser: Browser):
+    """Create the page reused by every test that asks for `page`."""
     context = browser.new_context(
         viewport={"width": VIEWPORT_WIDTH, "height": VIEWPORT_HEIGHT},
         device_scale_factor=1,
@@ -72,6 +81,35 @@ def page(browser: Browser):
 
 
 @pytest.fixture
+def page(session_page: Page):
+    """
+    Provide the shared session page, reset after each test.
+    
+    Creating a browser context per test costs far more than resetting one,
+    so tests share a context and leave it blank for the next test.
+    """
+    yield session_page
+    session_page.mouse.move(0, 0)
+    session_page.evaluate("""() => {
+        try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+    }""")
+    session_page.context.clear_cookies()
+    session_page.goto("about:blank")
+
+
+@pytest.fixture(scope="class")
+def class_page(browser: Browser):
+    """Create a page shared by all tests in a class."""
+    context = browser.new_context(
+        viewport={"width": VIEWPORT_WIDTH, "height": VIEWPORT_HEIGHT},
+        device_scale_factor=1,
+    )
+    page = context.new_page()
+    yield page
+    context.close()
+
+
+@pytest.fixture(scope="session")
 def test_server_url():
     """Base URL for test server serving component demos."""
     # Test server should be started separately
@@ -95,6 +133,51 @@ def pytest_addoption(parser):
     )
 
 
+def _decode_rgb(png_bytes: bytes) -> np.ndarray:
+    """
+    Decode PNG bytes to an RGB array.
+    
+    Not cached: each baseline is compared once per session, so a cache of
+    full-resolution arrays would only hold memory.
+    """
+    with Image.open(BytesIO(png_bytes)) as img:
+        return np.asarray(img.convert("RGB"), dtype=np.uint8)
+
+
+def _diff_fraction(current: np.ndarray, baseline: np.ndarray) -> float:
+    """
+    Fraction of pixels that differ in any channel between two same-shape
+    RGB arrays.
+    """
+    return float(np.any(current != baseline, axis=-1).mean())
+
+
+def _vips_rgb(image):
+    """Match PIL's convert("RGB"): grey expanded to sRGB, alpha dropped."""
+    if image.bands < 3:
+        image = image.colourspace("srgb")
+    return image.extract_band(0, n=3) if image.bands > 3 else image
+
+
+def _vips_diff_fraction(current_bytes: bytes, baseline_bytes: bytes) -> float | None:
+    """
+    Same measure as _diff_fraction, computed by libvips without building a
+    full diff image.
+    
+    Returns None when the images differ in size.
+    """
+    current = _vips_rgb(
+        pyvips.Image.new_from_buffer(current_bytes, "", access="sequential")
+    )
+    baseline = _vips_rgb(
+        pyvips.Image.new_from_buffer(baseline_bytes, "", access="sequential")
+    )
+    if (current.width, current.height) != (baseline.width, baseline.height):
+        return None
+    # != gives 255 per differing band; bandor folds the bands per pixel
+    return (current != baseline).bandor().avg() / 255
+
+
 class VisualTestHelper:
     """Helper class for visual regression testing operations."""
     
@@ -131,15 +214,14 @@ class VisualTestHelper:
         if setup_fn:
             setup_fn(self.page, selector)
             
-        # Wait for animations to settle
-        self.page.wait_for_timeout(500)
-        
-        # Capture screenshot
+        # Capture screenshot. animations="disabled" fast-forwards finite
+        # CSS animations/transitions to their end state (and resets infinite
+        # ones), so no fixed settle delay is needed.
         element = self.page.locator(selector)
         screenshot_name = f"{component_name}--{state}.png"
         screenshot_path = BASELINE_DIR / screenshot_name
         
-        screenshot_bytes = element.screenshot()
+        screenshot_bytes = element.screenshot(animations="disabled")
         
         if self.update_baselines:
             # Update baseline
@@ -171,53 +253,68 @@ class VisualTestHelper:
         
         Returns True if images match within threshold.
         """
-        from io import BytesIO
-        
-        # Load images
-        current_img = Image.open(BytesIO(current_bytes))
-        baseline_img = Image.open(baseline_path)
+        # Fast path: byte-identical PNGs hold identical pixels, which is the
+        # usual outcome of a passing test, so skip decoding altogether
+        baseline_bytes = baseline_path.read_bytes()
+        if current_bytes == baseline_bytes:
+            return True
+            
+        # libvips settles passing comparisons; failures fall through so the
+        # diff artifacts are produced by the PIL path below
+        if pyvips is not None:
+            difference_pct = _vips_diff_fraction(current_bytes, baseline_bytes)
+            if difference_pct is not None and difference_pct <= THRESHOLD:
+                return True
+                
+        # Decode both from the bytes already read above
+        current = _decode_rgb(current_bytes)
+        baseline = _decode_rgb(baseline_bytes)
         
         # Ensure same size
-        if current_img.size != baseline_img.size:
-            self._save_diff(current_img, baseline_img, name, "size_mismatch")
+        if current.shape != baseline.shape:
+            self._save_diff(current, baseline, name, "size_mismatch")
             return False
             
-        # Calculate difference
-        diff = ImageChops.difference(current_img, baseline_img)
-        
         # Calculate percentage difference
-        histogram = diff.histogram()
-        total_pixels = current_img.size[0] * current_img.size[1]
-        non_zero_pixels = sum(histogram[1:])  # Skip zero bucket
-        difference_pct = non_zero_pixels / (total_pixels * 3)  # 3 channels
+        difference_pct = _diff_fraction(current, baseline)
         
         if difference_pct > THRESHOLD:
-            self._save_diff(current_img, baseline_img, name, "visual_diff")
+            # Per-pixel heatmap: the largest channel difference
+            diff = np.abs(
+                current.astype(np.int16) - baseline.astype(np.int16)
+            ).max(axis=-1).astype(np.uint8)
+            self._save_diff(current, baseline, name, "visual_diff", diff)
             return False
             
         return True
     
     def _save_diff(
         self,
-        current: Image,
-        baseline: Image,
+        current: np.ndarray,
+        baseline: np.ndarray,
         name: str,
-        reason: str
+        reason: str,
+        diff: np.ndarray = None
     ):
-        """Save diff images for debugging."""
+        """
+        Save diff images for debugging.
+        
+        Writes the diff heatmap (or the current screenshot when the sizes
+        differ) and a baseline|current side-by-side built as one array.
+        """
         diff_path = DIFF_DIR / name.replace(".png", f"--{reason}.png")
-        current.save(diff_path)
+        Image.fromarray(current if diff is None else diff).save(diff_path)
         
-        # Also save side-by-side comparison
-        comparison = Image.new(
-            "RGB",
-            (current.width + baseline.width, max(current.height, baseline.height))
-        )
-        comparison.paste(baseline, (0, 0))
-        comparison.paste(current, (baseline.width, 0))
+        # Also save side-by-side comparison, padding the shorter image
+        height = max(current.shape[0], baseline.shape[0])
+        halves = [
+            np.pad(img, ((0, height - img.shape[0]), (0, 0), (0, 0)))
+            for img in (baseline, current)
+        ]
+        comparison = np.concatenate(halves, axis=1)
         
         comparison_path = DIFF_DIR / name.replace(".png", f"--comparison.png")
-        comparison.save(comparison_path)
+        Image.fromarray(comparison).save(comparison_path)
     
     def measure_performance(self, selector: str, interaction_fn=None) -> dict:
         """
@@ -305,7 +402,7 @@ def visual_test(page: Page, request):
     return VisualTestHelper(page, update_baselines)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def component_url(test_server_url):
     """Helper to construct component demo URLs."""
     def _url(component_path: str) -> str:
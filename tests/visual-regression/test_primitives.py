@@ -18,15 +18,33 @@ from playwright.sync_api import Page
 class TestButton:
     """Visual regression tests for Button primitive."""
     
-    def test_button_default(self, page: Page, component_url, visual_test):
+    @pytest.fixture(scope="class")
+    def button_page(self, class_page: Page, component_url):
+        """Load the button demo once for the whole class."""
+        class_page.goto(component_url("button.html"))
+        return class_page
+    
+    @pytest.fixture
+    def page(self, button_page: Page):
+        """Route visual_test to the shared button page."""
+        return button_page
+    
+    @pytest.fixture(autouse=True)
+    def reset_button_state(self, button_page: Page):
+        """Undo hover, focus and active state left by the previous test."""
+        yield
+        button_page.mouse.move(0, 0)
+        button_page.evaluate("""() => {
+            document.activeElement?.blur();
+            document.querySelectorAll('.active').forEach(el => el.classList.remove('active'));
+        }""")
+    
+    def test_button_default(self, visual_test):
         """Test button in default state."""
-        page.goto(component_url("button.html"))
         assert visual_test.capture_component("button-primary", "default")
     
-    def test_button_hover(self, page: Page, component_url, visual_test):
+    def test_button_hover(self, visual_test):
         """Test button in hover state."""
-        page.goto(component_url("button.html"))
-        
         def setup_hover(page, selector):
             page.hover(selector)
         
@@ -36,10 +54,8 @@ class TestButton:
             setup_fn=setup_hover
         )
     
-    def test_button_focus(self, page: Page, component_url, visual_test):
+    def test_button_focus(self, visual_test):
         """Test button in focus state."""
-        page.goto(component_url("button.html"))
-        
         def setup_focus(page, selector):
             page.focus(selector)
         
@@ -49,10 +65,8 @@ class TestButton:
             setup_fn=setup_focus
         )
     
-    def test_button_active(self, page: Page, component_url, visual_test):
+    def test_button_active(self, visual_test):
         """Test button in active (pressed) state."""
-        page.goto(component_url("button.html"))
-        
         def setup_active(page, selector):
             page.locator(selector).evaluate("el => el.classList.add('active')")
         
@@ -62,15 +76,12 @@ class TestButton:
             setup_fn=setup_active
         )
     
-    def test_button_disabled(self, page: Page, component_url, visual_test):
+    def test_button_disabled(self, visual_test):
         """Test button in disabled state."""
-        page.goto(component_url("button.html"))
         assert visual_test.capture_component("button-disabled", "disabled")
     
-    def test_button_performance(self, page: Page, component_url, visual_test):
+    def test_button_performance(self, visual_test):
         """Test button rendering performance against budgets."""
-        page.goto(component_url("button.html"))
-        
         def click_interaction(page, selector):
             page.click(selector)
         
@@ -6,7 +6,6 @@ Serves static HTML files for component demos.
 """
 
 import http.server
-import socketserver
 import os
 from pathlib import Path
 
@@ -21,16 +20,37 @@ class DemoHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(DEMO_DIR), **kwargs)
     
+    # Fixed per-response headers, encoded once
+    _EXTRA_HEADERS = (
+        b"Access-Control-Allow-Origin: *\r\n"
+        b"Cache-Control: no-store, no-cache, must-revalidate\r\n"
+    )
+    
     def end_headers(self):
         """Add CORS headers for local testing."""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        # Appended to the pending header buffer rather than written to wfile,
+        # so they still follow the status line. HTTP/0.9 responses have no
+        # buffer and send no headers at all.
+        if hasattr(self, '_headers_buffer'):
+            self._headers_buffer.append(self._EXTRA_HEADERS)
         super().end_headers()
+    
+    def copyfile(self, source, outputfile):
+        """
+        Send the response body with socket.sendfile (zero-copy on Linux).
+        
+        socket.sendfile falls back to plain send() for sources without a
+        file descriptor, such as the in-memory directory listing.
+        """
+        self.wfile.flush()
+        self.connection.sendfile(source)
 
 
 def start_server(port=PORT):
     """Start the test server."""
-    with socketserver.TCPServer(("", port), DemoHandler) as httpd:
+    # Threaded so a browser's concurrent demo/asset requests don't serialize;
+    # ThreadingHTTPServer already sets allow_reuse_address and daemon_threads
+    with http.server.ThreadingHTTPServer(("", port), DemoHandler) as httpd:
         print(f"Serving component demos at http://localhost:{port}")
         print(f"Demo directory: {DEMO_DIR}")
         print("Press Ctrl+C to stop")
@@ -9,11 +9,108 @@ Usage:
     python generate-all-structs.py
 """
 
+import hashlib
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from rust_struct_generator import RustStructGenerator
 
+# orjson is optional; it parses schemas straight from bytes, several times
+# faster than json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Sidecar in the output directory recording what each file was generated from
+# and what was written; ignored by git (see .gitignore)
+CACHE_FILE = ".codegen-cache.json"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _load_cache(cache_path: Path, generator_digest: str) -> dict:
+    """
+    Load schema name -> {"schema": digest, "output": digest} from the previous run.
+
+    Returns an empty cache if the file is missing, unreadable, or was written
+    by a different version of the generator.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("generator") != generator_digest:
+        return {}
+    schemas = cache.get("schemas")
+    return schemas if isinstance(schemas, dict) else {}
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Atomically replace path with data unless it already holds exactly that.
+
+    Leaving identical files untouched keeps their mtimes, so cargo doesn't
+    rebuild; the tmp file + os.replace means a crash never leaves a partial
+    file behind. Returns True if the file was written.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _module_name(schema_path: Path) -> str:
+    """domain.schema.json -> domain_generated"""
+    return schema_path.stem.replace(".schema", "_generated")
+
+
+def _output_matches(output_path: Path, expected_digest: str | None) -> bool:
+    """True if output_path exists and still holds what the last run wrote."""
+    try:
+        return expected_digest is not None and _digest(output_path.read_bytes()) == expected_digest
+    except OSError:
+        return False
+
+
+def _process_schema(schema_path: Path, output_path: Path) -> tuple[str, str | None, str | None]:
+    """
+    Generate the Rust file for one schema and write it to output_path.
+
+    Top-level so it can run in a worker process.
+
+    Returns:
+        (schema file name, digest of the written output or None on failure,
+        error message or None)
+    """
+    try:
+        # Read schema
+        schema = _json_loads(schema_path.read_bytes())
+
+        # Generate Rust code
+        generator = RustStructGenerator(schema)
+        rust_code = generator.generate()
+
+        # Write output
+        data = rust_code.encode("utf-8")
+        _write_if_changed(output_path, data)
+
+        return (schema_path.name, _digest(data), None)
+
+    except Exception as e:
+        return (schema_path.name, None, str(e))
+
 
 def generate_all_structs():
     """Generate Rust structs for all schemas in schemas/ directory."""
@@ -28,8 +125,8 @@ def generate_all_structs():
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Find all schema files
-    schema_files = list(schemas_dir.glob("*.schema.json"))
+    # Find all schema files (sorted, so mod.rs is stable across runs)
+    schema_files = sorted(schemas_dir.glob("*.schema.json"))
 
     if not schema_files:
         print(f"Warning: No schema files found in {schemas_dir}")
@@ -37,54 +134,93 @@ def generate_all_structs():
 
     print(f"Found {len(schema_files)} schema file(s)")
 
+    # Name each schema's module and output file once, for every loop below
+    modules = {schema_path: _module_name(schema_path) for schema_path in schema_files}
+    output_paths = {
+        schema_path: output_dir / (module + ".rs")
+        for schema_path, module in modules.items()
+    }
+    display_dir = output_dir.relative_to(project_root)
+
+    # Generator changes must invalidate every cached entry
+    generator_digest = _digest(
+        (Path(__file__).parent / "rust_struct_generator.py").read_bytes()
+    )
+    cache_path = output_dir / CACHE_FILE
+    cache = _load_cache(cache_path, generator_digest)
+
     generated_count = 0
+    skipped_count = 0
     failed_count = 0
 
+    # Skip schemas whose content matches the last successful run and whose
+    # output is still byte-for-byte what that run wrote (not hand-edited)
+    digests = {}
+    stale = []
     for schema_path in schema_files:
-        print(f"\nProcessing: {schema_path.name}")
-
         try:
-            # Read schema
-            with open(schema_path, "r", encoding="utf-8") as f:
-                schema = json.load(f)
-
-            # Generate Rust code
-            generator = RustStructGenerator(schema)
-            rust_code = generator.generate()
-
-            # Determine output filename
-            # domain.schema.json -> domain_generated.rs
-            output_name = schema_path.stem.replace(".schema", "_generated") + ".rs"
-            output_path = output_dir / output_name
-
-            # Write output
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(rust_code)
-
-            print(f"  ✓ Generated: {output_path.relative_to(project_root)}")
-            generated_count += 1
-
-        except Exception as e:
-            print(f"  ✗ Failed: {e}")
-            failed_count += 1
-
-    # Generate mod.rs to expose all generated modules
+            digest = _digest(schema_path.read_bytes())
+        except OSError:
+            digest = None  # let the worker report the read error
+        digests[schema_path.name] = digest
+        entry = cache.get(schema_path.name)
+        if (digest and isinstance(entry, dict) and entry.get("schema") == digest
+                and _output_matches(output_paths[schema_path], entry.get("output"))):
+            skipped_count += 1
+        else:
+            stale.append(schema_path)
+
+    if stale:
+        # Schemas are independent and generation is CPU-bound: one process each
+        max_workers = min(len(stale), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _process_schema, stale, [output_paths[p] for p in stale]
+            )
+
+            for schema_path, (schema_name, output_digest, error) in zip(stale, results):
+                print(f"\nProcessing: {schema_name}")
+
+                if output_digest is not None:
+                    print(f"  ✓ Generated: {display_dir / output_paths[schema_path].name}")
+                    cache[schema_name] = {
+                        "schema": digests[schema_name],
+                        "output": output_digest,
+                    }
+                    generated_count += 1
+                else:
+                    print(f"  ✗ Failed: {error}")
+                    cache.pop(schema_name, None)
+                    failed_count += 1
+
+    if skipped_count:
+        print(f"\nUp to date: {skipped_count} schema(s) unchanged")
+
+    # Drop entries for schemas that no longer exist
+    cache = {name: cache[name] for name in digests if name in cache}
+    _write_if_changed(
+        cache_path,
+        json.dumps({"generator": generator_digest, "schemas": cache}, indent=2).encode("utf-8")
+    )
+
+    # Generate mod.rs to expose all generated modules. Only rewrite it when
+    # the module list changes, so rustc doesn't rebuild for nothing.
     mod_rs_path = output_dir / "mod.rs"
-    with open(mod_rs_path, "w", encoding="utf-8") as f:
-        f.write("// Generated module exports\n")
-        f.write("// DO NOT EDIT MANUALLY\n\n")
-        for schema_path in schema_files:
-            module_name = schema_path.stem.replace(".schema", "_generated")
-            f.write(f"pub mod {module_name};\n")
-
-    print(f"\n✓ Generated mod.rs: {mod_rs_path.relative_to(project_root)}")
+    mod_rs = "// Generated module exports\n// DO NOT EDIT MANUALLY\n\n" + "".join(
+        f"pub mod {module};\n" for module in modules.values()
+    )
+    if _write_if_changed(mod_rs_path, mod_rs.encode("utf-8")):
+        print(f"\n✓ Generated mod.rs: {display_dir / mod_rs_path.name}")
+    else:
+        print(f"\n✓ mod.rs up to date: {display_dir / mod_rs_path.name}")
 
     # Summary
     print(f"\n{'='*60}")
     print(f"Summary:")
     print(f"  Generated: {generated_count}")
+    print(f"  Unchanged: {skipped_count}")
     print(f"  Failed: {failed_count}")
-    print(f"  Output directory: {output_dir.relative_to(project_root)}")
+    print(f"  Output directory: {display_dir}")
     print(f"{'='*60}")
 
     return 0 if failed_count == 0 else 1
@@ -13,6 +13,7 @@ Usage:
 import json
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
@@ -197,7 +198,10 @@ class RustStructGenerator:
         json_type = schema.get("type", "object")
         return self.TYPE_MAP.get(json_type, "serde_json::Value")
 
+    # Names repeat across properties, $refs and definitions; conversions are
+    # pure, so cache them per process
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _to_pascal_case(s: str) -> str:
         """Convert string to PascalCase."""
         # Handle already PascalCase
@@ -209,6 +213,7 @@ class RustStructGenerator:
         return "".join(word.capitalize() for word in words if word)
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _to_snake_case(s: str) -> str:
         """Convert string to snake_case."""
         # Handle camelCase
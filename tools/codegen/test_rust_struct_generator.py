@@ -5,17 +5,30 @@ Test suite for Rust struct generator.
 Run with: pytest test_rust_struct_generator.py
 """
 
-import json
 import pytest
-from rust_struct_generator import RustStructGenerator
+from typing import Final
 
 
-class TestRustStructGenerator:
-    """Test cases for RustStructGenerator."""
+def assert_all_in(output, needles):
+    """
+    Assert every needle appears in output, reporting all that are missing.
+
+    Needles are almost always whole generated lines, so they are checked
+    against a set of stripped lines first; only the rest fall back to a
+    substring scan of the full output. A single regex alternation over all
+    needles would miss needles that overlap an earlier match.
+    """
+    lines = {line.strip() for line in output.splitlines()}
+    missing = [n for n in needles if n not in lines and n not in output]
+    assert not missing, f"missing from generated code: {missing}"
 
-    def test_simple_struct(self):
-        """Test generation of a simple struct with basic types."""
-        schema = {
+
+# case name -> (schema, lines the generated Rust must contain). Built once at
+# import and shared by every test; the generator does not mutate schemas.
+GENERATION_CASES: Final = {
+    # Test generation of a simple struct with basic types.
+    "simple_struct": (
+        {
             "title": "User",
             "type": "object",
             "description": "A user account",
@@ -26,23 +39,20 @@ class TestRustStructGenerator:
                 "active": {"type": "boolean", "description": "Account status"},
             },
             "required": ["id", "name"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        # Check essential elements
-        assert "pub struct User {" in output
-        assert "pub id: String," in output
-        assert "pub name: String," in output
-        assert "pub age: Option<i64>," in output
-        assert "pub active: Option<bool>," in output
-        assert "#[derive(Debug, Clone, Serialize, Deserialize)]" in output
-        assert "/// A user account" in output
-
-    def test_camel_case_conversion(self):
-        """Test that camelCase properties are converted to snake_case."""
-        schema = {
+        },
+        [
+            "pub struct User {",
+            "pub id: String,",
+            "pub name: String,",
+            "pub age: Option<i64>,",
+            "pub active: Option<bool>,",
+            "#[derive(Debug, Clone, Serialize, Deserialize)]",
+            "/// A user account",
+        ],
+    ),
+    # Test that camelCase properties are converted to snake_case.
+    "camel_case_conversion": (
+        {
             "title": "Config",
             "type": "object",
             "properties": {
@@ -50,19 +60,17 @@ class TestRustStructGenerator:
                 "timeoutMs": {"type": "integer"},
             },
             "required": ["maxRetries"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        assert "pub max_retries: i64," in output
-        assert "pub timeout_ms: Option<i64>," in output
-        assert '#[serde(rename = "maxRetries")]' in output
-        assert '#[serde(rename = "timeoutMs")]' in output
-
-    def test_array_types(self):
-        """Test generation of array/Vec types."""
-        schema = {
+        },
+        [
+            "pub max_retries: i64,",
+            "pub timeout_ms: Option<i64>,",
+            '#[serde(rename = "maxRetries")]',
+            '#[serde(rename = "timeoutMs")]',
+        ],
+    ),
+    # Test generation of array/Vec types.
+    "array_types": (
+        {
             "title": "Playlist",
             "type": "object",
             "properties": {
@@ -77,17 +85,15 @@ class TestRustStructGenerator:
                 },
             },
             "required": ["tracks"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        assert "pub tracks: Vec<String>," in output
-        assert "pub tags: Option<Vec<String>>," in output
-
-    def test_nested_references(self):
-        """Test handling of $ref to definitions."""
-        schema = {
+        },
+        [
+            "pub tracks: Vec<String>,",
+            "pub tags: Option<Vec<String>>,",
+        ],
+    ),
+    # Test handling of $ref to definitions.
+    "nested_references": (
+        {
             "title": "Project",
             "type": "object",
             "properties": {
@@ -108,20 +114,17 @@ class TestRustStructGenerator:
                     "required": ["id", "name"],
                 }
             },
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        # Should generate both Project and User structs
-        assert "pub struct Project {" in output
-        assert "pub struct User {" in output
-        assert "pub owner: User," in output
-        assert "pub members: Option<Vec<User>>," in output
-
-    def test_optional_fields(self):
-        """Test that optional fields use Option<T> and skip_serializing_if."""
-        schema = {
+        },
+        [
+            "pub struct Project {",
+            "pub struct User {",
+            "pub owner: User,",
+            "pub members: Option<Vec<User>>,",
+        ],
+    ),
+    # Test that optional fields use Option<T> and skip_serializing_if.
+    "optional_fields": (
+        {
             "title": "Article",
             "type": "object",
             "properties": {
@@ -130,19 +133,17 @@ class TestRustStructGenerator:
                 "subtitle": {"type": "string"},
             },
             "required": ["id", "title"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        assert "pub id: String," in output
-        assert "pub title: String," in output
-        assert "pub subtitle: Option<String>," in output
-        assert '#[serde(skip_serializing_if = "Option::is_none")]' in output
-
-    def test_numeric_types(self):
-        """Test integer and number type mapping."""
-        schema = {
+        },
+        [
+            "pub id: String,",
+            "pub title: String,",
+            "pub subtitle: Option<String>,",
+            '#[serde(skip_serializing_if = "Option::is_none")]',
+        ],
+    ),
+    # Test integer and number type mapping.
+    "numeric_types": (
+        {
             "title": "Metrics",
             "type": "object",
             "properties": {
@@ -150,17 +151,15 @@ class TestRustStructGenerator:
                 "ratio": {"type": "number"},
             },
             "required": ["count", "ratio"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        assert "pub count: i64," in output
-        assert "pub ratio: f64," in output
-
-    def test_documentation_generation(self):
-        """Test that descriptions become doc comments."""
-        schema = {
+        },
+        [
+            "pub count: i64,",
+            "pub ratio: f64,",
+        ],
+    ),
+    # Test that descriptions become doc comments.
+    "documentation_generation": (
+        {
             "title": "AudioNode",
             "description": "Represents a node in the audio graph",
             "type": "object",
@@ -171,27 +170,15 @@ class TestRustStructGenerator:
                 },
             },
             "required": ["id"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        assert "/// Represents a node in the audio graph" in output
-        assert "/// Unique identifier for the node" in output
-
-    def test_case_conversion_helpers(self):
-        """Test the case conversion utility methods."""
-        assert RustStructGenerator._to_pascal_case("user_profile") == "UserProfile"
-        assert RustStructGenerator._to_pascal_case("audio-node") == "AudioNode"
-        assert RustStructGenerator._to_pascal_case("User") == "User"
-
-        assert RustStructGenerator._to_snake_case("userName") == "user_name"
-        assert RustStructGenerator._to_snake_case("maxRetries") == "max_retries"
-        assert RustStructGenerator._to_snake_case("id") == "id"
-
-    def test_enum_handling(self):
-        """Test that enums are handled as String with validation."""
-        schema = {
+        },
+        [
+            "/// Represents a node in the audio graph",
+            "/// Unique identifier for the node",
+        ],
+    ),
+    # Test that enums are handled as String with validation.
+    "enum_handling": (
+        {
             "title": "Status",
             "type": "object",
             "properties": {
@@ -201,17 +188,14 @@ class TestRustStructGenerator:
                 },
             },
             "required": ["state"],
-        }
-
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
-
-        # Should use String for now (validation at runtime)
-        assert "pub state: String," in output
-
-    def test_one_of_handling(self):
-        """Test that oneOf uses serde_json::Value."""
-        schema = {
+        },
+        [
+            "pub state: String,",
+        ],
+    ),
+    # Test that oneOf uses serde_json::Value.
+    "one_of_handling": (
+        {
             "title": "Event",
             "type": "object",
             "properties": {
@@ -223,14 +207,53 @@ class TestRustStructGenerator:
                 },
             },
             "required": ["payload"],
-        }
+        },
+        [
+            "use serde_json;",
+            "pub payload: serde_json::Value,",
+        ],
+    ),
+}
+
+
+@pytest.fixture(scope="session")
+def generator_cls():
+    """RustStructGenerator, imported only when a selected test needs it."""
+    from rust_struct_generator import RustStructGenerator
+    return RustStructGenerator
+
+
+@pytest.fixture(scope="session")
+def all_outputs(generator_cls):
+    """Generated Rust code for every case, produced in one pass per session."""
+    # Cases stay separate schemas rather than one combined schema: otherwise
+    # one case's output (imports, derives, docs) could satisfy another's
+    # expectations. Each schema is still generated only once per session.
+    return {
+        name: generator_cls(schema).generate()
+        for name, (schema, _) in GENERATION_CASES.items()
+    }
+
+
+class TestRustStructGenerator:
+    """Test cases for RustStructGenerator."""
 
-        generator = RustStructGenerator(schema)
-        output = generator.generate()
+    @pytest.mark.parametrize("case", GENERATION_CASES)
+    def test_generates(self, all_outputs, case):
+        """Test that each schema's generated code contains the expected lines."""
+        _, expected = GENERATION_CASES[case]
+        assert_all_in(all_outputs[case], expected)
+
+    def test_case_conversion_helpers(self, generator_cls):
+        """Test the case conversion utility methods."""
+        assert generator_cls._to_pascal_case("user_profile") == "UserProfile"
+        assert generator_cls._to_pascal_case("audio-node") == "AudioNode"
+        assert generator_cls._to_pascal_case("User") == "User"
 
-        assert "use serde_json;" in output
-        assert "pub payload: serde_json::Value," in output
+        assert generator_cls._to_snake_case("userName") == "user_name"
+        assert generator_cls._to_snake_case("maxRetries") == "max_retries"
+        assert generator_cls._to_snake_case("id") == "id"
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
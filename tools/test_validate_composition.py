@@ -5,21 +5,48 @@ Tests for validate_composition tool.
 Run with: pytest test_validate_composition.py
 """
 
+import io
 import json
 import pytest
-from pathlib import Path
-from tempfile import NamedTemporaryFile
-from validate_composition import CompositionValidator
+
+try:
+    from orjson import dumps as _json_dumps
+except ImportError:  # optional; msgspec, then stdlib json fallback
+    try:
+        from msgspec.json import encode as _json_dumps
+    except ImportError:
+        def _json_dumps(data):
+            return json.dumps(data).encode('utf-8')
 
 
 def create_test_graph(nodes, edges):
-    """Helper to create a temporary graph file for testing."""
-    with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump({'nodes': nodes, 'edges': edges}, f)
-        return Path(f.name)
+    """Helper to build an in-memory graph document for testing."""
+    return {'nodes': nodes, 'edges': edges}
+
+
+@pytest.fixture(scope='session')
+def composition():
+    """The validate_composition module, imported only when a test needs it."""
+    import validate_composition
+    return validate_composition
+
+
+@pytest.fixture(scope='session')
+def _shared_validator(composition):
+    return composition.CompositionValidator(None)
 
 
-def test_primitive_cannot_contain_components():
+@pytest.fixture
+def validator(_shared_validator):
+    """
+    The session's validator, counting violations only; tests load their
+    graph via set_graph and opt into collect_details when they read records.
+    """
+    _shared_validator.collect_details = False
+    return _shared_validator
+
+
+def test_primitive_cannot_contain_components(validator):
     """Test that primitives cannot contain any other components."""
     nodes = [
         {
@@ -37,18 +64,15 @@ def test_primitive_cannot_contain_components():
         {'from': 'button', 'to': 'icon', 'type': 'composedOf'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.collect_details = True
+    validator.set_graph(nodes, edges)
     
     assert not validator.validate_all()
     assert len(validator.violations) == 1
     assert 'primitive' in validator.violations[0]['error']
-    
-    graph_path.unlink()
 
 
-def test_molecule_can_contain_primitives():
+def test_molecule_can_contain_primitives(validator):
     """Test that molecules can contain primitives."""
     nodes = [
         {
@@ -66,17 +90,13 @@ def test_molecule_can_contain_primitives():
         {'from': 'search-field', 'to': 'input', 'type': 'composedOf'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.set_graph(nodes, edges)
     
     assert validator.validate_all()
-    assert len(validator.violations) == 0
-    
-    graph_path.unlink()
+    assert validator.violation_count == 0
 
 
-def test_molecule_cannot_contain_organism():
+def test_molecule_cannot_contain_organism(validator):
     """Test that molecules cannot contain organisms."""
     nodes = [
         {
@@ -94,17 +114,13 @@ def test_molecule_cannot_contain_organism():
         {'from': 'card', 'to': 'header', 'type': 'composedOf'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.set_graph(nodes, edges)
     
     assert not validator.validate_all()
-    assert len(validator.violations) == 1
-    
-    graph_path.unlink()
+    assert validator.violation_count == 1
 
 
-def test_organism_can_contain_molecules_and_primitives():
+def test_organism_can_contain_molecules_and_primitives(validator):
     """Test that organisms can contain molecules and primitives."""
     nodes = [
         {
@@ -128,17 +144,13 @@ def test_organism_can_contain_molecules_and_primitives():
         {'from': 'header', 'to': 'logo', 'type': 'composedOf'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.set_graph(nodes, edges)
     
     assert validator.validate_all()
-    assert len(validator.violations) == 0
-    
-    graph_path.unlink()
+    assert validator.violation_count == 0
 
 
-def test_template_can_contain_multiple_levels():
+def test_template_can_contain_multiple_levels(validator):
     """Test that templates can contain organisms, molecules, and primitives."""
     nodes = [
         {
@@ -162,17 +174,13 @@ def test_template_can_contain_multiple_levels():
         {'from': 'dashboard', 'to': 'card', 'type': 'composedOf'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.set_graph(nodes, edges)
     
     assert validator.validate_all()
-    assert len(validator.violations) == 0
-    
-    graph_path.unlink()
+    assert validator.violation_count == 0
 
 
-def test_non_composition_edges_ignored():
+def test_non_composition_edges_ignored(validator):
     """Test that non-composition edges are not validated."""
     nodes = [
         {
@@ -190,17 +198,13 @@ def test_non_composition_edges_ignored():
         {'from': 'button', 'to': 'button-impl', 'type': 'implementedBy'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.set_graph(nodes, edges)
     
     assert validator.validate_all()
-    assert len(validator.violations) == 0
-    
-    graph_path.unlink()
+    assert validator.violation_count == 0
 
 
-def test_multiple_violations_reported():
+def test_multiple_violations_reported(validator):
     """Test that multiple violations are all reported."""
     nodes = [
         {
@@ -229,11 +233,252 @@ def test_multiple_violations_reported():
         {'from': 'card', 'to': 'header', 'type': 'composedOf'}
     ]
     
-    graph_path = create_test_graph(nodes, edges)
-    validator = CompositionValidator(graph_path)
-    validator.load_graph()
+    validator.set_graph(nodes, edges)
+    
+    assert not validator.validate_all()
+    assert validator.violation_count == 2
+
+
+def test_count_only_scan_matches_visitor_pass(composition):
+    """Test that the count-only fast path counts what the visitors report."""
+    nodes = [
+        {
+            'id': level,
+            'type': 'DesignSpecNode',
+            'properties': {'name': level.title(), 'level': level}
+        }
+        for level in composition.CompositionValidator.COMPOSITION_RULES
+    ]
+    nodes.append({'id': 'misc', 'type': 'DesignSpecNode', 'properties': {'level': 'misc'}})
+    ids = [node['id'] for node in nodes] + ['missing']
+    edges = [
+        {'from': parent, 'to': child, 'type': 'composedOf'}
+        for parent in ids for child in ids if parent != child
+    ]
+    
+    counting = composition.CompositionValidator(None, collect_details=False)
+    counting.set_graph(nodes, edges)
+    detailed = composition.CompositionValidator(None)
+    detailed.set_graph(nodes, edges)
+    
+    assert not counting.validate_all()
+    assert not detailed.validate_all()
+    assert counting.violation_count == len(detailed.violations)
+    
+    # Subclasses keep the bulk count unless they change the rule in visit()
+    class SubclassedRule(composition.CompositionRuleVisitor):
+        pass
+    
+    class StricterRule(composition.CompositionRuleVisitor):
+        def visit(self, edge, ctx):
+            return [{'edge': edge, 'error': 'stricter'}]
+    
+    edges = counting.composition_edges
+    cycle_count = len(counting.find_cycles())
+    rule_count = counting.violation_count - cycle_count
+    assert SubclassedRule().count_violations(edges, counting) == rule_count
+    assert StricterRule().count_violations(edges, counting) is None
+    counting.visitors = [StricterRule()]
+    assert not counting.validate_all()
+    assert counting.violation_count == len(edges) + cycle_count
+
+
+def test_count_only_report(validator, capsys):
+    """Test that a count-only run reports failure without listing details."""
+    nodes = [
+        {
+            'id': 'button',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Button', 'level': 'primitive'}
+        },
+        {
+            'id': 'icon',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Icon', 'level': 'primitive'}
+        }
+    ]
+    edges = [
+        {'from': 'button', 'to': 'icon', 'type': 'composedOf'}
+    ]
+    
+    validator.set_graph(nodes, edges)
+    
+    assert not validator.validate_all()
+    validator.print_report()
+    out = capsys.readouterr().out
+    assert out == "✗ Found 1 violation(s) (details not collected)\n"
+    assert validator.get_exit_code() == 1
+
+
+def test_allowed_masks_match_composition_rules(composition):
+    """Test that the bitmask tables encode exactly the allowed-children sets."""
+    CompositionValidator = composition.CompositionValidator
+    bits = CompositionValidator.LEVEL_BIT
+    masks = CompositionValidator.ALLOWED_MASK
+    for level, allowed in CompositionValidator.COMPOSITION_RULES.items():
+        assert allowed == {child for child, bit in bits.items() if masks[level] & bit}
+
+
+@pytest.fixture(scope='session')
+def streaming_graph_bytes():
+    """
+    Serialized graph for the streaming test, encoded once per session so
+    repeated runs (e.g. pytest --count) reuse the same bytes.
+    """
+    nodes = [
+        {
+            'id': 'button',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Button', 'level': 'primitive'}
+        },
+        {
+            'id': 'icon',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Icon', 'level': 'primitive'}
+        }
+    ]
+    edges = [
+        {'from': 'button', 'to': 'icon', 'type': 'composedOf'},
+        {'from': 'button', 'to': 'icon', 'type': 'references'}
+    ]
+    return _json_dumps(create_test_graph(nodes, edges))
+
+
+def test_streaming_load_matches_full_load(composition, streaming_graph_bytes):
+    """Test that --stream loading finds the same violations."""
+    pytest.importorskip('ijson')
+    raw = streaming_graph_bytes
+    validator = composition.CompositionValidator(None, stream=True)
+    assert validator.load_graph(io.BytesIO(raw))
+    full = composition.CompositionValidator(None)
+    assert full.load_graph(io.BytesIO(raw))
+    
+    assert len(validator.composition_edges) == 1
+    assert not validator.validate_all()
+    assert not full.validate_all()
+    assert validator.violations == full.violations
+
+
+def test_load_graph_from_file(composition, tmp_path):
+    """Test loading a graph from a real file path."""
+    nodes = [
+        {
+            'id': 'button',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Button', 'level': 'primitive'}
+        },
+        {
+            'id': 'icon',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Icon', 'level': 'primitive'}
+        }
+    ]
+    edges = [
+        {'from': 'button', 'to': 'icon', 'type': 'composedOf'}
+    ]
+    graph_path = tmp_path / 'graph.json'
+    graph_path.write_bytes(_json_dumps(create_test_graph(nodes, edges)))
+    
+    validator = composition.CompositionValidator(graph_path)
+    assert validator.load_graph()
+    assert validator.node_level == {'button': 'primitive', 'icon': 'primitive'}
+    assert not validator.validate_all()
+    assert validator.violation_count == 1
+
+
+def test_load_graph_missing_file(composition, tmp_path, capsys):
+    """Test that a missing graph file fails to load."""
+    validator = composition.CompositionValidator(tmp_path / 'missing.json')
+    assert not validator.load_graph()
+    assert 'Graph file not found' in capsys.readouterr().err
+
+
+def test_load_graph_invalid_json(composition, tmp_path, capsys):
+    """Test that a malformed graph file fails to load."""
+    graph_path = tmp_path / 'graph.json'
+    graph_path.write_text('{"nodes": [')
+    
+    validator = composition.CompositionValidator(graph_path)
+    assert not validator.load_graph()
+    assert 'Invalid JSON' in capsys.readouterr().err
+
+
+def test_composition_cycle_reported(validator):
+    """Test that cycles in the composedOf hierarchy are reported."""
+    nodes = [
+        {
+            'id': 'panel',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Panel'}
+        },
+        {
+            'id': 'section',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Section'}
+        },
+        {
+            'id': 'frame',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Frame'}
+        }
+    ]
+    edges = [
+        {'from': 'panel', 'to': 'section', 'type': 'composedOf'},
+        {'from': 'section', 'to': 'panel', 'type': 'composedOf'},
+        {'from': 'frame', 'to': 'frame', 'type': 'composedOf'}
+    ]
+    
+    validator.collect_details = True
+    validator.set_graph(nodes, edges)
     
     assert not validator.validate_all()
     assert len(validator.violations) == 2
+    cycles = sorted(sorted(v['cycle']) for v in validator.violations)
+    assert cycles == [['frame'], ['panel', 'section']]
+
+
+def test_extra_visitor_runs_in_same_pass(composition):
+    """Test that registered visitors see every composition edge once."""
+    nodes = [
+        {
+            'id': 'card',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Card', 'level': 'molecule'}
+        },
+        {
+            'id': 'button',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Button', 'level': 'primitive'}
+        },
+        {
+            'id': 'icon',
+            'type': 'DesignSpecNode',
+            'properties': {'name': 'Icon', 'level': 'primitive'}
+        }
+    ]
+    edges = [
+        {'from': 'card', 'to': 'button', 'type': 'composedOf'},
+        {'from': 'button', 'to': 'icon', 'type': 'composedOf'},
+        {'from': 'card', 'to': 'icon', 'type': 'composedOf'},
+        {'from': 'card', 'to': 'button', 'type': 'references'}
+    ]
     
-    graph_path.unlink()
\ No newline at end of file
+    class RecordingVisitor(composition.EdgeVisitor):
+        def begin(self, ctx):
+            self.seen = []
+            
+        def visit(self, edge, ctx):
+            self.seen.append((edge['from'], edge['to']))
+            return [{'edge': edge, 'error': 'recorded'}] if edge['to'] == 'icon' else []
+    
+    validator = composition.CompositionValidator.from_dict(create_test_graph(nodes, edges))
+    recorder = RecordingVisitor()
+    validator.visitors.append(recorder)
+    
+    assert not validator.validate_all()
+    assert sorted(recorder.seen) == [
+        ('button', 'icon'), ('card', 'button'), ('card', 'icon')
+    ]
+    errors = [v['error'] for v in validator.violations]
+    assert errors.count('recorded') == 2
+    assert len(errors) == 3
@@ -8,14 +8,158 @@ This tool checks that composition relationships follow design system rules:
 - Organisms can contain molecules and primitives
 - Templates can contain organisms, molecules, and primitives
 - Pages can contain any component type
+- The composedOf hierarchy contains no cycles
 
 See: harmony-design/DESIGN_SYSTEM.md#composition-validation
 """
 
 import json
 import sys
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import BinaryIO, Dict, List, Sequence, Set, Tuple
+
+# orjson, else msgspec, is optional; either parses large graphs several times
+# faster than json. orjson.JSONDecodeError subclasses json.JSONDecodeError;
+# msgspec raises its own DecodeError, so it is added to the caught errors.
+_DECODE_ERRORS: tuple = (json.JSONDecodeError,)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    try:
+        import msgspec
+        _json_loads = msgspec.json.decode
+        _DECODE_ERRORS += (msgspec.DecodeError,)
+    except ImportError:
+        _json_loads = json.loads
+
+# ijson is optional; used by --stream to validate huge graphs without
+# loading the whole document
+try:
+    import ijson
+    _STREAM_ERRORS: tuple = (ijson.JSONError,)
+except ImportError:
+    ijson = None
+    _STREAM_ERRORS = ()
+
+# Shared empty rule set for levels that may contain nothing
+_EMPTY: frozenset = frozenset()
+
+# Returned by visitors for edges that pass, so the common case allocates nothing
+_NO_VIOLATIONS: Tuple[dict, ...] = ()
+
+# Returned for a failing edge when details are off: counted, never formatted
+_COUNTED_ONLY: Tuple[None] = (None,)
+
+# Marks "no parent cached yet"; None is a possible (missing) parent id
+_UNSET = object()
+
+
+def _breaks_rules(parent_mask: int | None, child_bit: int | None) -> bool:
+    """
+    The composition rule check, shared by every code path that applies it.
+    
+    Nodes without a level (mask or bit None) are not checked; otherwise the
+    edge breaks the rules unless the child's bit is in the parent's mask.
+    """
+    return (
+        parent_mask is not None and child_bit is not None
+        and not child_bit & parent_mask
+    )
+
+
+def _level_masks(rules: Dict[str, frozenset]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Assign each level a bit and OR together the bits of its allowed children."""
+    bits = {level: 1 << i for i, level in enumerate(rules)}
+    masks = {
+        level: sum(bits[child] for child in children)
+        for level, children in rules.items()
+    }
+    return bits, masks
+
+
+class EdgeVisitor(ABC):
+    """
+    A per-edge rule run by CompositionValidator.validate_all.
+    
+    validate_all walks the composition edges once and hands each edge to
+    every registered visitor, so adding a rule does not add another pass
+    over the graph.
+    """
+    
+    def begin(self, ctx: 'CompositionValidator') -> None:
+        """Reset any per-run state before the first edge is visited."""
+        
+    @abstractmethod
+    def visit(self, edge: dict, ctx: 'CompositionValidator') -> Sequence[dict | None]:
+        """
+        Check one composition edge.
+        
+        Args:
+            edge: Edge dict with 'from' and 'to' fields
+            ctx: The validator, for its node lookups
+            
+        Returns:
+            Violation dicts for this edge (empty if it passes); entries
+            may be None when ctx.collect_details is off, as only their
+            number is used
+        """
+        
+    def count_violations(self, edges: List[dict], ctx: 'CompositionValidator') -> int | None:
+        """
+        Count violations over all edges at once, for count-only runs.
+        
+        validate_all uses this instead of per-edge visit() calls when this
+        is the only visitor and collect_details is off. Edges are not
+        grouped by parent here.
+        
+        Returns:
+            The violation count, or None to fall back to visit()
+        """
+        return None
+
+
+class CompositionRuleVisitor(EdgeVisitor):
+    """Checks edges against CompositionValidator.COMPOSITION_RULES."""
+    
+    def begin(self, ctx: 'CompositionValidator') -> None:
+        # validate_all feeds edges grouped by parent, so caching the last
+        # parent's allowed-children mask resolves each parent once
+        self._parent_id = _UNSET
+        self._parent_mask = None
+        
+    def visit(self, edge: dict, ctx: 'CompositionValidator') -> Sequence[dict | None]:
+        parent_id = edge.get('from')
+        if parent_id != self._parent_id:
+            self._parent_id = parent_id
+            self._parent_mask = ctx.node_allowed_mask.get(parent_id)
+            
+        child_id = edge.get('to')
+        if not _breaks_rules(self._parent_mask, ctx.node_level_bit.get(child_id)):
+            return _NO_VIOLATIONS
+        if not ctx.collect_details:
+            return _COUNTED_ONLY
+            
+        node_level = ctx.node_level
+        return ({
+            'edge': edge,
+            'error': ctx._composition_error(
+                parent_id, node_level[parent_id], child_id, node_level[child_id]
+            )
+        },)
+        
+    def count_violations(self, edges: List[dict], ctx: 'CompositionValidator') -> int | None:
+        # A subclass that changes visit() changes the rule; let it be visited
+        if type(self).visit is not CompositionRuleVisitor.visit:
+            return None
+        level_bit = ctx.node_level_bit.get
+        allowed_mask = ctx.node_allowed_mask.get
+        return sum(
+            1 for edge in edges
+            if _breaks_rules(allowed_mask(edge.get('from')), level_bit(edge.get('to')))
+        )
 
 
 class CompositionValidator:
@@ -23,56 +167,158 @@ class CompositionValidator:
     
     # Define valid composition rules: component_level -> allowed_child_levels
     COMPOSITION_RULES = {
-        'primitive': set(),  # Primitives cannot contain other components
-        'molecule': {'primitive'},
-        'organism': {'molecule', 'primitive'},
-        'template': {'organism', 'molecule', 'primitive'},
-        'page': {'template', 'organism', 'molecule', 'primitive'}
+        'primitive': _EMPTY,  # Primitives cannot contain other components
+        'molecule': frozenset({'primitive'}),
+        'organism': frozenset({'molecule', 'primitive'}),
+        'template': frozenset({'organism', 'molecule', 'primitive'}),
+        'page': frozenset({'template', 'organism', 'molecule', 'primitive'})
+    }
+    
+    # Bit per level, and per level the OR of the bits it may contain, so an
+    # edge check is one AND: LEVEL_BIT[child] & ALLOWED_MASK[parent].
+    # Unrecognized levels get bit 0 and mask 0 (contain and fit in nothing).
+    LEVEL_BIT, ALLOWED_MASK = _level_masks(COMPOSITION_RULES)
+    
+    # Allowed-children text for violation messages, formatted once per level
+    _ALLOWED_STR = {
+        level: ', '.join(sorted(children)) or 'none'
+        for level, children in COMPOSITION_RULES.items()
     }
     
-    def __init__(self, graph_path: Path):
+    def __init__(self, graph_path: Path | None, stream: bool = False,
+                 collect_details: bool = True):
         """
         Initialize validator with graph data.
         
         Args:
             graph_path: Path to the graph JSON file containing nodes and edges
+            stream: Stream the file with ijson (if installed) to bound memory
+                on very large graphs
+            collect_details: Build violation records (needed by
+                print_report); if False only violation_count is kept
         """
         self.graph_path = graph_path
+        self.stream = stream
         self.nodes: Dict[str, dict] = {}
         self.edges: List[dict] = []
+        self.composition_edges: List[dict] = []
+        # Per-node lookups precomputed in load_graph. One flat dict per field
+        # rather than a record per node: the edge check reads a single field
+        # of each node, so it is one lookup straight to a plain int.
+        self.node_level: Dict[str, str | None] = {}
+        # Level bit and allowed-children mask of each node with a level
+        self.node_level_bit: Dict[str, int] = {}
+        self.node_allowed_mask: Dict[str, int] = {}
+        self.node_name: Dict[str, str] = {}
+        self.collect_details = collect_details
         self.violations: List[dict] = []
+        self.violation_count = 0
+        # Per-edge rules run by validate_all in a single pass
+        self.visitors: List[EdgeVisitor] = [CompositionRuleVisitor()]
+        
+    def load_graph(self, source: BinaryIO | None = None) -> bool:
+        """
+        Load graph data from JSON file.
         
-    def load_graph(self) -> bool:
-        """Load graph data from JSON file."""
+        Args:
+            source: Binary file-like object to read instead of graph_path;
+                must be seekable when streaming
+        """
         try:
-            with open(self.graph_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # Index nodes by id for quick lookup
-            for node in data.get('nodes', []):
-                self.nodes[node['id']] = node
-                
-            self.edges = data.get('edges', [])
+            if self.stream and ijson is not None:
+                self._load_graph_streaming(source)
+                return True
+            
+            # One read of the raw bytes; every parser decodes UTF-8 itself
+            raw = source.read() if source is not None else self.graph_path.read_bytes()
+            self._load_data(_json_loads(raw))
             return True
             
         except FileNotFoundError:
             print(f"Error: Graph file not found: {self.graph_path}", file=sys.stderr)
             return False
-        except json.JSONDecodeError as e:
+        except (*_DECODE_ERRORS, *_STREAM_ERRORS) as e:
             print(f"Error: Invalid JSON in graph file: {e}", file=sys.stderr)
             return False
+    
+    def set_graph(self, nodes: List[dict], edges: List[dict]) -> None:
+        """
+        Replace the loaded graph in place, without file I/O.
+        
+        Lets one validator (and its visitors) be reused across graphs;
+        results from the previous graph are discarded.
+        """
+        self.nodes = {}
+        self.node_level = {}
+        self.node_level_bit = {}
+        self.node_allowed_mask = {}
+        self.node_name = {}
+        self.violations = []
+        self.violation_count = 0
+        self._load_data({'nodes': nodes, 'edges': edges})
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CompositionValidator':
+        """Create a validator for an already-parsed graph (no file I/O)."""
+        validator = cls(None)
+        validator._load_data(data)
+        return validator
+        
+    def _load_data(self, data: dict) -> None:
+        """Index a parsed graph document."""
+        self._index_nodes(data.get('nodes', []))
+        
+        self.edges = data.get('edges', [])
+        # Only composition edges are validated; filter them once here
+        self.composition_edges = [
+            e for e in self.edges if e.get('type') == 'composedOf'
+        ]
+    
+    def _load_graph_streaming(self, source: BinaryIO | None = None) -> None:
+        """
+        Load the graph with ijson, keeping only composition edges.
+        
+        Nodes and edges are streamed in two passes so the full document
+        and non-composition edges are never held in memory. self.edges
+        stays empty in this mode.
+        """
+        def open_source():
+            if source is None:
+                return open(self.graph_path, 'rb')
+            source.seek(0)
+            return nullcontext(source)
+        
+        with open_source() as f:
+            self._index_nodes(ijson.items(f, 'nodes.item', use_float=True))
             
-    def get_component_level(self, node_id: str) -> str | None:
-        """Get the component level (primitive, molecule, etc.) for a node."""
-        node = self.nodes.get(node_id)
-        if not node:
-            return None
+        with open_source() as f:
+            self.composition_edges = [
+                e for e in ijson.items(f, 'edges.item', use_float=True)
+                if e.get('type') == 'composedOf'
+            ]
+    
+    def _index_nodes(self, nodes) -> None:
+        """Index nodes by id and precompute their level and display name."""
+        for node in nodes:
+            node_id = node['id']
+            self.nodes[node_id] = node
             
-        # Check if it's a DesignSpecNode with a level property
-        if node.get('type') == 'DesignSpecNode':
-            return node.get('properties', {}).get('level')
+            # Resolve level (DesignSpecNode only) and display name once per node
+            properties = node.get('properties', {})
+            level = (
+                properties.get('level')
+                if node.get('type') == 'DesignSpecNode' else None
+            )
+            self.node_level[node_id] = level
+            if level:
+                self.node_level_bit[node_id] = self.LEVEL_BIT.get(level, 0)
+                self.node_allowed_mask[node_id] = self.ALLOWED_MASK.get(level, 0)
+            self.node_name[node_id] = properties.get('name', node_id)
             
-        return None
+    def get_component_level(self, node_id: str) -> str | None:
+        """Get the component level (primitive, molecule, etc.) for a node."""
+        # Only DesignSpecNodes carry a level; see load_graph
+        return self.node_level.get(node_id)
         
     def validate_composition_edge(self, edge: dict) -> Tuple[bool, str | None]:
         """
@@ -87,31 +333,35 @@ class CompositionValidator:
         if edge.get('type') != 'composedOf':
             return (True, None)  # Only validate composition edges
             
+        return self._check_composition(edge)
+        
+    def _check_composition(self, edge: dict) -> Tuple[bool, str | None]:
+        """Validate an edge already known to be a composition edge."""
         parent_id = edge.get('from')
         child_id = edge.get('to')
         
-        parent_level = self.get_component_level(parent_id)
-        child_level = self.get_component_level(child_id)
+        # Direct dict lookups: this runs per edge, so skip the method calls
+        parent_mask = self.node_allowed_mask.get(parent_id)
+        child_bit = self.node_level_bit.get(child_id)
         
-        # Skip validation if either node is not a component or level is unknown
-        if not parent_level or not child_level:
+        # Passes if allowed, or if either node is not a component or has no level
+        if not _breaks_rules(parent_mask, child_bit):
             return (True, None)
-            
-        # Check if this composition is allowed
-        allowed_children = self.COMPOSITION_RULES.get(parent_level, set())
         
-        if child_level not in allowed_children:
-            parent_name = self.nodes[parent_id].get('properties', {}).get('name', parent_id)
-            child_name = self.nodes[child_id].get('properties', {}).get('name', child_id)
-            
-            error = (
-                f"Invalid composition: {parent_level} '{parent_name}' "
-                f"cannot contain {child_level} '{child_name}'. "
-                f"Allowed children: {', '.join(sorted(allowed_children)) if allowed_children else 'none'}"
-            )
-            return (False, error)
-            
-        return (True, None)
+        # Violation: only now build the message
+        node_level = self.node_level
+        return (False, self._composition_error(
+            parent_id, node_level[parent_id], child_id, node_level[child_id]
+        ))
+        
+    def _composition_error(self, parent_id: str, parent_level: str,
+                           child_id: str, child_level: str) -> str:
+        """Format the message for a disallowed parent/child pairing."""
+        return (
+            f"Invalid composition: {parent_level} '{self.node_name[parent_id]}' "
+            f"cannot contain {child_level} '{self.node_name[child_id]}'. "
+            f"Allowed children: {self._ALLOWED_STR.get(parent_level, 'none')}"
+        )
         
     def validate_all(self) -> bool:
         """
@@ -121,48 +371,173 @@ class CompositionValidator:
             True if all validations pass, False otherwise
         """
         self.violations = []
+        collect = self.collect_details
+        count = 0
+        
+        visitors = self.visitors
+        for visitor in visitors:
+            visitor.begin(self)
         
-        for edge in self.edges:
-            is_valid, error = self.validate_composition_edge(edge)
-            if not is_valid:
-                self.violations.append({
-                    'edge': edge,
-                    'error': error
-                })
+        # No composition edges: nothing to check and no cycles possible
+        if not self.composition_edges:
+            self.violation_count = 0
+            return True
+        
+        # Count-only run with a single visitor: let it count in one flat
+        # scan, without per-edge visit() calls or parent grouping
+        bulk = None
+        if not collect and len(visitors) == 1:
+            bulk = visitors[0].count_violations(self.composition_edges, self)
+        if bulk is not None:
+            count = bulk
+        else:
+            # Group by parent so visitors see each parent's edges together and
+            # can resolve per-parent data once, however many children it has
+            by_parent: Dict[str, List[dict]] = {}
+            for edge in self.composition_edges:
+                by_parent.setdefault(edge.get('from'), []).append(edge)
+            
+            violations = self.violations
+            for group in by_parent.values():
+                for edge in group:
+                    for visitor in visitors:
+                        found = visitor.visit(edge, self)
+                        if found:
+                            count += len(found)
+                            if collect:
+                                violations.extend(found)
                 
-        return len(self.violations) == 0
+        cycles = self.find_cycles()
+        count += len(cycles)
+        if collect:
+            violations.extend(cycles)
+        
+        self.violation_count = count
+        return count == 0
+        
+    def find_cycles(self) -> List[dict]:
+        """
+        Find cycles in the composedOf hierarchy.
+        
+        Uses an iterative Tarjan strongly-connected-components pass, so the
+        graph is walked once (O(V+E)) and deep hierarchies cannot hit the
+        recursion limit. Every SCC with more than one node, and every
+        self-loop, is a cycle.
+        
+        Returns:
+            List of violation dicts with 'edge', 'cycle' and 'error' fields
+        """
+        children: Dict[str, List[str]] = defaultdict(list)
+        for edge in self.composition_edges:
+            children[edge.get('from')].append(edge.get('to'))
+            
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        
+        for root in list(children):
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(children.get(root, ())))]
+            
+            while work:
+                node, pending = work[-1]
+                for child in pending:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(children.get(child, ()))))
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component[::-1])
+                        
+        violations = []
+        for component in components:
+            if len(component) == 1 and component[0] not in children[component[0]]:
+                continue
+            members = set(component)
+            edge = next(
+                e for e in self.composition_edges
+                if e.get('from') in members and e.get('to') in members
+            )
+            names = [self.node_name.get(node_id, node_id) for node_id in component]
+            if len(component) == 1:
+                error = f"Composition cycle: '{names[0]}' contains itself"
+            else:
+                error = f"Composition cycle among: {', '.join(repr(n) for n in names)}"
+            violations.append({
+                'edge': edge,
+                'cycle': component,
+                'error': error
+            })
+        return violations
         
     def print_report(self) -> None:
         """Print validation report to stdout."""
-        if not self.violations:
-            print("✓ All composition rules validated successfully")
-            print(f"  Checked {len([e for e in self.edges if e.get('type') == 'composedOf'])} composition relationships")
-            return
+        # Build the whole report and write it once rather than per line
+        if self.violation_count == 0:
+            lines = [
+                "✓ All composition rules validated successfully",
+                f"  Checked {len(self.composition_edges)} composition relationships",
+            ]
+        elif not self.violations:
+            # Count-only run (collect_details=False): no records to list
+            lines = [f"✗ Found {self.violation_count} violation(s) (details not collected)"]
+        else:
+            lines = [f"✗ Found {len(self.violations)} composition rule violation(s):", ""]
             
-        print(f"✗ Found {len(self.violations)} composition rule violation(s):\n")
-        
-        for i, violation in enumerate(self.violations, 1):
-            print(f"{i}. {violation['error']}")
-            edge = violation['edge']
-            print(f"   Edge: {edge.get('from')} -> {edge.get('to')}")
-            print()
+            for i, violation in enumerate(self.violations, 1):
+                lines.append(f"{i}. {violation['error']}")
+                edge = violation['edge']
+                lines.append(f"   Edge: {edge.get('from')} -> {edge.get('to')}")
+                if 'cycle' in violation:
+                    lines.append(f"   Cycle nodes: {', '.join(violation['cycle'])}")
+                lines.append("")
+                
+        sys.stdout.write('\n'.join(lines) + '\n')
             
     def get_exit_code(self) -> int:
         """Get exit code based on validation results."""
-        return 0 if len(self.violations) == 0 else 1
+        return 0 if self.violation_count == 0 else 1
 
 
 def main():
     """Main entry point for the validation tool."""
-    if len(sys.argv) < 2:
-        print("Usage: validate_composition.py <path_to_graph.json>", file=sys.stderr)
+    args = [arg for arg in sys.argv[1:] if arg != '--stream']
+    stream = len(args) != len(sys.argv) - 1
+    
+    if not args:
+        print("Usage: validate_composition.py [--stream] <path_to_graph.json>", file=sys.stderr)
         print("\nValidates component composition rules in the design system graph.")
         print("See harmony-design/DESIGN_SYSTEM.md#composition-validation for rules.")
         sys.exit(1)
         
-    graph_path = Path(sys.argv[1])
+    graph_path = Path(args[0])
+    
+    if stream and ijson is None:
+        print("Warning: ijson not installed; loading graph without streaming", file=sys.stderr)
     
-    validator = CompositionValidator(graph_path)
+    validator = CompositionValidator(graph_path, stream=stream)
     
     if not validator.load_graph():
         sys.exit(1)